@@ -3,6 +3,14 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from werkzeug.middleware.proxy_fix import ProxyFix
+from app.utils.rate_limit import RateLimiter
+from app.utils.idempotency import IdempotencyGuard
+from app.utils.blob_store import BlobStore
+from app.utils.overdue import OverdueScheduler
+from app.utils.token_blocklist import TokenBlocklist
+from app.utils.response_cache import ResponseCache
+from app.utils.profiler import RequestProfiler
 import logging
 import os
 
@@ -10,6 +18,13 @@ import os
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
+limiter = RateLimiter()
+idempotency = IdempotencyGuard()
+photo_store = BlobStore()
+overdue_scheduler = OverdueScheduler()
+token_blocklist = TokenBlocklist()
+response_cache = ResponseCache()
+profiler = RequestProfiler()
 
 def create_app(config_name='development'):
     """
@@ -21,11 +36,25 @@ def create_app(config_name='development'):
     from app.config import config
     app.config.from_object(config.get(config_name, config['development']))
     
+    # Trust X-Forwarded-For only for the configured number of reverse proxies in front of us
+    if app.config.get('PROXY_FIX_X_FOR'):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    
     # Initialize database connection, migrations, and CORS for frontend
     db.init_app(app)
-    migrate.init_app(app, db)
+    # Schema changes ship as Alembic revisions in backend/migrations (batch mode for SQLite ALTERs)
+    migrate.init_app(app, db, directory=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations'),
+                     render_as_batch=True)
     jwt.init_app(app)
-    CORS(app, supports_credentials=True, origins=["http://localhost:5173", "http://localhost:5174"])
+    limiter.init_app(app)
+    idempotency.init_app(app)
+    photo_store.init_app(app)
+    overdue_scheduler.init_app(app)
+    token_blocklist.init_app(app)
+    response_cache.init_app(app)
+    profiler.init_app(app)
+    CORS(app, supports_credentials=True, origins=["http://localhost:5173", "http://localhost:5174"],
+         expose_headers=["ETag", "Retry-After", "Idempotent-Replayed", "X-Cache", "X-Profile-Id"])
     
     # JWT error handlers
     @jwt.invalid_token_loader
@@ -40,15 +69,34 @@ def create_app(config_name='development'):
     def expired_token_callback(jwt_header, jwt_payload):
         return jsonify({'success': False, 'error': 'Token has expired'}), 401
     
-    # Register route blueprints: tools management and authentication
+    # Revocation check runs on every authenticated request; see app/utils/token_blocklist.py
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return token_blocklist.is_revoked(jwt_payload['jti'])
+    
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({'success': False, 'error': 'Token has been revoked'}), 401
+    
+    # Register route blueprints: tools management, authentication, and health probes
     with app.app_context():
         from app.routes.tools_routes import tools_bp
         from app.routes.auth_routes import auth_bp
+        from app.routes.health_routes import health_bp
+        from app.routes.photo_routes import photos_bp
+        from app.routes.locations_routes import locations_bp
+        from app.routes.admin_routes import admin_bp
         from app.utils.error_handler import register_error_handlers
+        from app.cli import register_commands
         
         app.register_blueprint(tools_bp)
         app.register_blueprint(auth_bp)
+        app.register_blueprint(health_bp)
+        app.register_blueprint(photos_bp)
+        app.register_blueprint(locations_bp)
+        app.register_blueprint(admin_bp)
         register_error_handlers(app)
+        register_commands(app)
         
         app.logger.info('✅ Flask app initialized')
     
@@ -0,0 +1,22 @@
+"""
+Flask CLI commands.
+Schema setup runs as its own step (`flask --app wsgi init-db`, the same as
+`flask --app wsgi db upgrade`) so that server workers never race each other
+creating tables at boot.
+"""
+import click
+from flask_migrate import upgrade
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    def init_db():
+        """Create the schema, or bring an existing database up to date, via the Alembic migrations."""
+        upgrade()
+        click.echo('✅ Database schema up to date')
+    
+    @app.cli.command('rebuild-locations')
+    def rebuild_locations():
+        """Link free-text tool/material locations to the hierarchy and recompute rollups."""
+        from app.utils.locations import rebuild_rollups
+        rebuild_rollups()
+        click.echo('✅ Location rollups rebuilt')
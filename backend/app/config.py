@@ -10,6 +10,69 @@ class Config:
     # JWT Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev-secret-key-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=7)
+    # Revoked-token Bloom filter: sizing and how often workers sync with revoked_tokens
+    JWT_BLOCKLIST_CAPACITY = 100000
+    JWT_BLOCKLIST_ERROR_RATE = 0.01
+    JWT_BLOCKLIST_REFRESH_SECONDS = int(os.getenv('JWT_BLOCKLIST_REFRESH_SECONDS', 5))
+    JWT_BLOCKLIST_PURGE_SECONDS = 3600
+    # Shared store file used by 'shared' backends (visible to all workers on the host)
+    SHARED_STORE_PATH = os.getenv('SHARED_STORE_PATH', 'instance/shared_store.db')
+    # Number of reverse proxies that append to X-Forwarded-For (0 = connect directly, header ignored)
+    PROXY_FIX_X_FOR = int(os.getenv('PROXY_FIX_X_FOR', 0))
+    # Rate limiting: token buckets per IP/user; backend is 'memory' or 'shared'
+    # ('memory' is refused when more than one worker runs)
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_BACKEND = os.getenv('RATELIMIT_BACKEND', 'memory')
+    RATELIMIT_OVERRIDES = {}  # e.g. {'auth.login': '20/minute', 'tools': '120/minute'}
+    # Admission control: shed load with 503 when the worker is saturated.
+    # Under gunicorn gthread only GUNICORN_THREADS requests run in Flask at once, so the
+    # in-flight cap defaults to that and the server-side queue limit does the shedding.
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+    ADMISSION_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_MAX_IN_FLIGHT', os.getenv('GUNICORN_THREADS', 4)))
+    ADMISSION_MAX_QUEUED = int(os.getenv('ADMISSION_MAX_QUEUED', 2 * int(os.getenv('GUNICORN_THREADS', 4))))
+    ADMISSION_MAX_QUEUE_WAIT = float(os.getenv('ADMISSION_MAX_QUEUE_WAIT', 0.5))
+    ADMISSION_RETRY_AFTER = 1
+    # Idempotency-Key replay store for retried mutations; backend is 'memory' or 'shared'
+    # ('memory' is refused when more than one worker runs)
+    IDEMPOTENCY_BACKEND = os.getenv('IDEMPOTENCY_BACKEND', 'memory')
+    IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 86400))
+    IDEMPOTENCY_MAX_KEYS = int(os.getenv('IDEMPOTENCY_MAX_KEYS', 10000))
+    # Read-through response cache for tool/material GETs; backend is 'memory' or 'shared'
+    # ('memory' is refused when more than one worker runs)
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 30))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 5000))
+    # Tool photos: content-addressed blob directory and background thumbnailing
+    PHOTO_STORAGE_PATH = os.getenv('PHOTO_STORAGE_PATH', 'instance/photos')
+    PHOTO_MAX_BYTES = int(os.getenv('PHOTO_MAX_BYTES', 15 * 1024 * 1024))
+    # Hard cap on any request body, chunked uploads included (413); leaves room for multipart framing
+    MAX_CONTENT_LENGTH = PHOTO_MAX_BYTES + 64 * 1024
+    PHOTO_THUMBNAIL_SIZE = 320
+    PHOTO_THUMBNAIL_WORKERS = int(os.getenv('PHOTO_THUMBNAIL_WORKERS', 2))
+    # Inventory reconciliation: max serials per audit and per IN (...) query
+    RECONCILE_MAX_SERIALS = int(os.getenv('RECONCILE_MAX_SERIALS', 100000))
+    RECONCILE_CHUNK_SIZE = 500
+    # Overdue checkouts: loan limit in hours per asset_type, with a default
+    OVERDUE_LOAN_LIMITS = {
+        'power_tool': 72,
+        'testing_equipment': 48,
+        'measuring_tool': 48,
+        'hand_tool': 168,
+    }
+    OVERDUE_DEFAULT_LOAN_HOURS = int(os.getenv('OVERDUE_DEFAULT_LOAN_HOURS', 168))
+    OVERDUE_RESYNC_SECONDS = int(os.getenv('OVERDUE_RESYNC_SECONDS', 300))
+    # Claims that make one worker emit each overdue event; 'shared' with several workers
+    OVERDUE_EVENT_BACKEND = os.getenv('OVERDUE_EVENT_BACKEND', 'memory')
+    OVERDUE_EVENT_TTL = int(os.getenv('OVERDUE_EVENT_TTL', 30 * 86400))
+    # On-demand request profiler (off by default; no hooks are installed when disabled)
+    PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'false').lower() == 'true'
+    PROFILER_TOKEN = os.getenv('PROFILER_TOKEN')  # X-Profile header / ?_profile= value
+    PROFILER_SAMPLE_RATE = int(os.getenv('PROFILER_SAMPLE_RATE', 0))  # profile 1 in N requests; 0 = off
+    PROFILER_PATH = os.getenv('PROFILER_PATH', 'instance/profiles')
+    PROFILER_MAX_ARTIFACTS = int(os.getenv('PROFILER_MAX_ARTIFACTS', 50))
+    # Behind nginx/Apache, set USE_X_SENDFILE=true to hand photo transfers to the proxy
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
 
 class DevelopmentConfig(Config):
     """Development environment."""
@@ -23,11 +86,17 @@ class ProductionConfig(Config):
     """Production environment."""
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///trade_tracker.db')
+    RATELIMIT_BACKEND = os.getenv('RATELIMIT_BACKEND', 'shared')
+    IDEMPOTENCY_BACKEND = os.getenv('IDEMPOTENCY_BACKEND', 'shared')
+    OVERDUE_EVENT_BACKEND = os.getenv('OVERDUE_EVENT_BACKEND', 'shared')
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'shared')
 
 class TestingConfig(Config):
     """Testing environment."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    RATELIMIT_ENABLED = False
+    OVERDUE_SCHEDULER_ENABLED = False
 
 config = {
     'development': DevelopmentConfig,
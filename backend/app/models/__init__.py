@@ -49,15 +49,21 @@ class Tool(db.Model):
     asset_type = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     serial_number = db.Column(db.String(100), unique=True)
-    location = db.Column(db.String(255))
+    location = db.Column(db.String(255), index=True)  # Display path of location_id, e.g. 'Site B - Floor 2'
+    location_id = db.Column(db.Integer, db.ForeignKey('locations.id'), index=True)
     status = db.Column(db.String(50), default='available')
-    checkout_date = db.Column(db.DateTime)  # When asset was last checked out
+    checkout_date = db.Column(db.DateTime, index=True)  # When asset was last checked out
     is_available = db.Column(db.Boolean, default=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))  # Owner of the tool
     checked_out_by = db.Column(db.Integer, db.ForeignKey('users.id'))  # Track who has the tool
+    photo_hash = db.Column(db.String(64))  # SHA-256 of the photo in the blob store
+    version = db.Column(db.Integer, nullable=False, server_default='1')  # Optimistic concurrency counter
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Every UPDATE checks and bumps version; a concurrent change raises StaleDataError
+    __mapper_args__ = {'version_id_col': version}
+    
     # Relationships: cascade deletes logs when asset is deleted
     checkout_logs = db.relationship('CheckoutLog', backref='asset', cascade='all, delete-orphan')
     audit_logs = db.relationship('AuditLog', backref='asset', cascade='all, delete-orphan')
@@ -69,10 +75,15 @@ class Tool(db.Model):
             'asset_type': self.asset_type,
             'serial_number': self.serial_number,
             'location': self.location,
+            'location_id': self.location_id,
             'status': self.status,
             'is_available': self.is_available,
             'checked_out_by': self.checked_out_by,
             'checkout_date': self.checkout_date.isoformat() if self.checkout_date else None,
+            'photo_hash': self.photo_hash,
+            'photo_url': f'/api/photos/{self.photo_hash}' if self.photo_hash else None,
+            'thumbnail_url': f'/api/photos/{self.photo_hash}/thumbnail' if self.photo_hash else None,
+            'version': self.version,
         }
 
 class Material(db.Model):
@@ -88,11 +99,15 @@ class Material(db.Model):
     quantity = db.Column(db.Integer, default=0)
     min_stock = db.Column(db.Integer, default=5)
     location = db.Column(db.String(255))
+    location_id = db.Column(db.Integer, db.ForeignKey('locations.id'), index=True)
     cost_per_unit = db.Column(db.Float)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    version = db.Column(db.Integer, nullable=False, server_default='1')  # Optimistic concurrency counter
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __mapper_args__ = {'version_id_col': version}
+    
     def needs_reorder(self):
         """Check if material quantity is at or below minimum stock threshold"""
         return self.quantity <= self.min_stock
@@ -104,7 +119,46 @@ class Material(db.Model):
             'unit': self.unit,
             'quantity': self.quantity,
             'min_stock': self.min_stock,
+            'location': self.location,
+            'location_id': self.location_id,
             'needs_reorder': self.needs_reorder(),
+            'version': self.version,
+        }
+
+class Location(db.Model):
+    """
+    Location model: site -> building -> floor hierarchy.
+    tool_count/material_count are rollups over the whole subtree, kept current
+    incrementally whenever a tool or material is placed, moved or removed.
+    """
+    __tablename__ = 'locations'
+    __table_args__ = (
+        db.UniqueConstraint('parent_id', 'name', name='uq_locations_parent_name'),
+        # NULLs never collide in the constraint above, so sites (no parent) need their own index
+        db.Index('uq_locations_site_name', 'name', unique=True,
+                 sqlite_where=db.text('parent_id IS NULL'), postgresql_where=db.text('parent_id IS NULL')),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)
+    kind = db.Column(db.String(20), nullable=False, default='site')  # site, building, or floor
+    parent_id = db.Column(db.Integer, db.ForeignKey('locations.id'), index=True)
+    path = db.Column(db.String(255), nullable=False)  # Full display path, e.g. 'Site B - Floor 2'
+    tool_count = db.Column(db.Integer, nullable=False, default=0)
+    material_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    parent = db.relationship('Location', remote_side=[id], backref='children')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'kind': self.kind,
+            'parent_id': self.parent_id,
+            'path': self.path,
+            'tool_count': self.tool_count,
+            'material_count': self.material_count,
         }
 
 class CheckoutLog(db.Model):
@@ -135,3 +189,17 @@ class AuditLog(db.Model):
     details = db.Column(db.Text)
     location = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RevokedToken(db.Model):
+    """
+    RevokedToken model for JWT revocation (logout, role changes).
+    Rows are purged once the token would have expired on its own.
+    """
+    __tablename__ = 'revoked_tokens'
+    # Workers sync on id > last seen id, so ids must never be reused after a purge
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
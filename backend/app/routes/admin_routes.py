@@ -0,0 +1,40 @@
+from flask import Blueprint, jsonify, send_file
+from flask_jwt_extended import jwt_required
+from app import profiler
+from app.routes.tools_routes import require_role
+from app.utils.error_handler import APIError
+
+"""
+Admin Routes
+Request profiles captured by the on-demand profiler (Superintendent only).
+"""
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+@admin_bp.route('/profiles', methods=['GET'])
+@jwt_required()
+@require_role(['superintendent'])
+def list_profiles():
+    """List stored request profiles, newest first."""
+    return jsonify({'success': True, 'enabled': profiler.enabled, 'profiles': profiler.list_profiles()}), 200
+
+@admin_bp.route('/profiles/<profile_id>', methods=['GET'])
+@jwt_required()
+@require_role(['superintendent'])
+def get_profile(profile_id):
+    """Profile details: timing, SQL statements and top functions by cumulative time."""
+    path = profiler.artifact_path(profile_id, '.json')
+    if not path:
+        raise APIError("Profile not found", 404)
+    return send_file(path, mimetype='application/json')
+
+@admin_bp.route('/profiles/<profile_id>/download', methods=['GET'])
+@jwt_required()
+@require_role(['superintendent'])
+def download_profile(profile_id):
+    """Raw cProfile output, for `python -m pstats` or snakeviz."""
+    path = profiler.artifact_path(profile_id, '.prof')
+    if not path:
+        raise APIError("Profile not found", 404)
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f'{profile_id}.prof')
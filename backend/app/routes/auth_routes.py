@@ -1,14 +1,23 @@
 """Authentication routes for TradeFlow."""
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from app import db
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
+from app import db, limiter, token_blocklist
 from app.models import User
 from app.utils.error_handler import ValidationError, APIError
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.exc import OperationalError
+from datetime import datetime, timezone
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+def revoke_current_token():
+    """Add the JWT used for this request to the revocation list."""
+    claims = get_jwt()
+    expires_at = datetime.fromtimestamp(claims['exp'], timezone.utc).replace(tzinfo=None)
+    token_blocklist.revoke(claims['jti'], expires_at)
+
 @auth_bp.route('/register', methods=['POST'])
+@limiter.limit('5/minute', per='ip')
 def register():
     """Register a new user."""
     try:
@@ -48,10 +57,13 @@ def register():
     
     except ValidationError as e:
         return jsonify({'success': False, 'error': e.message}), e.status_code
+    except OperationalError:
+        raise  # lock timeouts become 503 in the app-wide handler
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@limiter.limit('10/minute', per='ip')
 def login():
     """Login user and return JWT token."""
     try:
@@ -79,6 +91,8 @@ def login():
         return jsonify({'success': False, 'error': e.message}), e.status_code
     except APIError as e:
         return jsonify({'success': False, 'error': e.message}), e.status_code
+    except OperationalError:
+        raise  # lock timeouts become 503 in the app-wide handler
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -100,13 +114,16 @@ def get_current_user():
     
     except APIError as e:
         return jsonify({'success': False, 'error': e.message}), e.status_code
+    except OperationalError:
+        raise  # lock timeouts become 503 in the app-wide handler
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    """Logout user (JWT is stateless, so just return success)."""
+    """Logout user by revoking the current token."""
+    revoke_current_token()
     return jsonify({
         'success': True,
         'message': 'Logout successful'
@@ -131,8 +148,9 @@ def change_role():
         user.role = new_role
         db.session.commit()
         
-        # Create new token with updated role
+        # Create new token with updated role and revoke the old one
         access_token = create_access_token(identity=user.id)
+        revoke_current_token()
         
         return jsonify({
             'success': True,
@@ -145,6 +163,8 @@ def change_role():
         return jsonify({'success': False, 'error': e.message}), e.status_code
     except APIError as e:
         return jsonify({'success': False, 'error': e.message}), e.status_code
+    except OperationalError:
+        raise  # lock timeouts become 503 in the app-wide handler
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -159,5 +179,7 @@ def get_users():
             'users': [user.to_dict() for user in users]
         }), 200
     
+    except OperationalError:
+        raise  # lock timeouts become 503 in the app-wide handler
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,26 @@
+"""Health and readiness probes for load balancers and process managers."""
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+from app import db, response_cache
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness probe: the worker is up and serving requests."""
+    return jsonify({'success': True, 'status': 'ok'}), 200
+
+@health_bp.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness probe: the worker can reach the database."""
+    try:
+        db.session.execute(text('SELECT 1'))
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'status': 'unavailable', 'error': str(e)}), 503
+    return jsonify({'success': True, 'status': 'ready'}), 200
+
+@health_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Per-worker counters (response cache hits/misses)."""
+    return jsonify({'success': True, 'response_cache': response_cache.stats()}), 200
@@ -0,0 +1,63 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app import db
+from app.models import Location
+from app.routes.tools_routes import require_role
+from app.utils.error_handler import APIError, ValidationError
+from app.utils.locations import create_child, PATH_SEPARATOR
+
+"""
+Location Routes
+Site -> building -> floor hierarchy with per-location inventory rollups.
+"""
+
+locations_bp = Blueprint('locations', __name__, url_prefix='/api/locations')
+
+@locations_bp.route('', methods=['GET'])
+def list_locations():
+    """List locations, optionally only the children of ?parent_id= (use 0 for top-level sites)."""
+    query = Location.query
+    parent_id = request.args.get('parent_id', type=int)
+    if parent_id is not None:
+        query = query.filter(Location.parent_id == (parent_id or None))
+    locations = query.order_by(Location.path).all()
+    return jsonify({'success': True, 'locations': [l.to_dict() for l in locations]}), 200
+
+@locations_bp.route('', methods=['POST'])
+@jwt_required()
+@require_role(['foreman', 'superintendent'])
+def create_location():
+    """
+    Create a location under an optional parent. (Foreman/Superintendent only)
+    An existing location with the same parent and name is returned unchanged with 200.
+    """
+    data = request.get_json() or {}
+    name = (data.get('name') or '').strip()
+    if not name or PATH_SEPARATOR in name:
+        raise ValidationError(f"name required and must not contain '{PATH_SEPARATOR.strip()}'")
+    
+    parent = None
+    if data.get('parent_id') is not None:
+        parent = db.session.get(Location, data['parent_id'])
+        if not parent:
+            raise ValidationError("parent_id not found")
+    
+    kind = data.get('kind') if data.get('kind') in ('site', 'building', 'floor') else None
+    location, created = create_child(parent, name, kind)
+    if not created:
+        return jsonify({'success': True, 'location': location.to_dict()}), 200
+    db.session.commit()
+    return jsonify({'success': True, 'location': location.to_dict()}), 201
+
+@locations_bp.route('/<int:location_id>/inventory', methods=['GET'])
+def location_inventory(location_id):
+    """Tool and material counts for a location and everything under it, read from the rollup row."""
+    location = db.session.get(Location, location_id)
+    if not location:
+        raise APIError("Location not found", 404)
+    return jsonify({
+        'success': True,
+        'location': location.to_dict(),
+        'tool_count': location.tool_count,
+        'material_count': location.material_count,
+    }), 200
@@ -0,0 +1,45 @@
+"""
+Photo serving routes.
+Photos are addressed by content hash, so a URL always returns the same bytes:
+responses are cacheable forever and support conditional and range requests.
+"""
+from flask import Blueprint, send_file
+from app import photo_store
+from app.utils.blob_store import HASH_RE, sniff_image_type
+from app.utils.error_handler import APIError
+
+photos_bp = Blueprint('photos', __name__, url_prefix='/api/photos')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+PENDING_THUMBNAIL_MAX_AGE = 60
+
+def send_blob(path, mimetype, max_age, etag):
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=etag, max_age=max_age)
+    if max_age == IMMUTABLE_MAX_AGE:
+        response.cache_control.immutable = True
+    response.cache_control.public = True
+    return response
+
+def send_original(blob_hash, max_age):
+    if not HASH_RE.match(blob_hash) or not photo_store.exists(blob_hash):
+        raise APIError("Photo not found", 404)
+    path = photo_store.path(blob_hash)
+    with open(path, 'rb') as f:
+        mimetype = sniff_image_type(f.read(12)) or 'application/octet-stream'
+    return send_blob(path, mimetype, max_age, blob_hash)
+
+@photos_bp.route('/<blob_hash>', methods=['GET'])
+def get_photo(blob_hash):
+    """Serve an original photo (sendfile, Range and If-None-Match supported)."""
+    return send_original(blob_hash, IMMUTABLE_MAX_AGE)
+
+@photos_bp.route('/<blob_hash>/thumbnail', methods=['GET'])
+def get_thumbnail(blob_hash):
+    """Serve a photo thumbnail; falls back to the original (briefly cached) until it is generated."""
+    if not HASH_RE.match(blob_hash) or not photo_store.exists(blob_hash):
+        raise APIError("Photo not found", 404)
+    if photo_store.exists(blob_hash, thumbnail=True):
+        return send_blob(photo_store.path(blob_hash, thumbnail=True), 'image/jpeg',
+                         IMMUTABLE_MAX_AGE, f'{blob_hash}-thumb')
+    photo_store.schedule_thumbnail(blob_hash)
+    return send_original(blob_hash, PENDING_THUMBNAIL_MAX_AGE)
@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
+from app import db, limiter, photo_store, overdue_scheduler, response_cache
 from app.models import Tool, Material, CheckoutLog, AuditLog, User
-from app.utils.error_handler import APIError, ValidationError
+from app.utils.error_handler import APIError, ValidationError, ConflictError
+from app.utils.blob_store import sniff_image_type, BlobTooLarge
+from app.utils.locations import (resolve_location, assign_location, adjust_rollup, find_path, split_path,
+                                 subtree_ids, PATH_SEPARATOR)
+from sqlalchemy.orm.exc import StaleDataError
 from datetime import datetime
 
 """
@@ -16,6 +20,9 @@ Role-based access:
 
 tools_bp = Blueprint('tools', __name__, url_prefix='/api/tools')
 
+# Write routes share one bucket per user (per IP when unauthenticated)
+limiter.limit_blueprint(tools_bp, '60/minute', per='user', methods=('POST', 'PUT', 'DELETE'))
+
 def get_current_user():
     """Helper to get current user from JWT token."""
     try:
@@ -38,9 +45,45 @@ def require_role(allowed_roles):
         return wrapper
     return decorator
 
+# ========== OPTIMISTIC CONCURRENCY (ETag / If-Match) ==========
+
+def versioned_response(key, obj, status_code=200):
+    """JSON response for a single versioned row, with its version as the ETag."""
+    response = jsonify({'success': True, key: obj.to_dict()})
+    response.headers['ETag'] = f'"{obj.version}"'
+    return response, status_code
+
+def check_if_match(key, obj):
+    """Reject the write with 409 if the client's If-Match ETag is not the current version."""
+    if_match = request.headers.get('If-Match')
+    if not if_match or if_match.strip() == '*':
+        return
+    tags = {tag.strip().removeprefix('W/').strip('"') for tag in if_match.split(',')}
+    if str(obj.version) not in tags:
+        raise ConflictError(f"{key.capitalize()} was modified by another request", key, obj.to_dict())
+
+def commit_versioned(key, model, obj_id):
+    """Commit; if a concurrent writer bumped the version first, return 409 with the fresh row."""
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        current = db.session.get(model, obj_id)
+        if not current:
+            raise APIError(f"{key.capitalize()} not found", 404)
+        raise ConflictError(f"{key.capitalize()} was modified by another request", key, current.to_dict())
+
+def invalidate_tool(tool_id=None):
+    """Evict cached tool reads after a write: the paginated lists and, if given, the single tool."""
+    if tool_id is None:
+        response_cache.invalidate('tools')
+    else:
+        response_cache.invalidate('tools', f'tool:{tool_id}')
+
 # ========== TOOL CRUD ENDPOINTS ==========
 
 @tools_bp.route('', methods=['GET'])
+@response_cache.cached('tools', args={'page': (int, 1), 'per_page': (int, 10)})
 def list_tools():
     """Fetch all tools with pagination support."""
     page = request.args.get('page', 1, type=int)
@@ -56,12 +99,13 @@ def list_tools():
     }), 200
 
 @tools_bp.route('/<int:tool_id>', methods=['GET'])
+@response_cache.cached('tool:{tool_id}')
 def get_tool(tool_id):
     """Retrieve a single tool by ID."""
     tool = Tool.query.get(tool_id)
     if not tool:
         raise APIError("Tool not found", 404)
-    return jsonify({'success': True, 'tool': tool.to_dict()}), 200
+    return versioned_response('tool', tool)
 
 @tools_bp.route('', methods=['POST'])
 @jwt_required()
@@ -85,35 +129,41 @@ def create_tool():
         asset_type=data.get('asset_type', 'equipment'),
         description=data.get('description'),
         serial_number=serial_number,
-        location=data.get('location'),
         is_available=True,
         status='available'
     )
+    assign_location(tool, resolve_location(data), 'tool_count')
     db.session.add(tool)
     db.session.commit()
-    return jsonify({'success': True, 'tool': tool.to_dict()}), 201
+    invalidate_tool()
+    return versioned_response('tool', tool, 201)
 
 @tools_bp.route('/<int:tool_id>', methods=['PUT'])
 def update_tool(tool_id):
-    """Update tool fields (name, location, description, status). Serial number updates use separate endpoint."""
+    """Update tool fields (name, location, description, status). Serial number updates use separate endpoint.
+    Send If-Match with the tool's ETag to get 409 instead of overwriting a concurrent change."""
     tool = Tool.query.get(tool_id)
     if not tool:
         raise APIError("Tool not found", 404)
+    check_if_match('tool', tool)
     
     data = request.get_json() or {}
+    moving = 'location' in data or 'location_id' in data
+    location = resolve_location(data) if moving else None
     
     # Update permitted fields
     if 'name' in data:
         tool.name = data['name']
-    if 'location' in data:
-        tool.location = data['location']
+    if moving:
+        assign_location(tool, location, 'tool_count')
     if 'description' in data:
         tool.description = data['description']
     if 'status' in data:
         tool.status = data['status']
     
-    db.session.commit()
-    return jsonify({'success': True, 'tool': tool.to_dict()}), 200
+    commit_versioned('tool', Tool, tool_id)
+    invalidate_tool(tool_id)
+    return versioned_response('tool', tool)
 
 @tools_bp.route('/<int:tool_id>', methods=['DELETE'])
 def delete_tool(tool_id):
@@ -121,8 +171,12 @@ def delete_tool(tool_id):
     tool = Tool.query.get(tool_id)
     if not tool:
         raise APIError("Tool not found", 404)
+    check_if_match('tool', tool)
+    adjust_rollup(tool.location_id, 'tool_count', -1)
     db.session.delete(tool)
-    db.session.commit()
+    commit_versioned('tool', Tool, tool_id)
+    invalidate_tool(tool_id)
+    overdue_scheduler.untrack(tool_id)
     return jsonify({'success': True}), 200
 
 # ========== TOOL CHECKOUT/CHECKIN TRACKING ==========
@@ -135,21 +189,25 @@ def checkout_tool(tool_id):
         raise APIError("Tool not found", 404)
     
     data = request.get_json() or {}
+    # Resolve (and create if needed) the location before touching the tool
+    location = resolve_location(data, default='unknown')
     # Create checkout log entry for audit trail
     checkout = CheckoutLog(
         tool_id=tool.id,
-        location_checkout=data.get('location', 'unknown')
+        location_checkout=location.path
     )
     # Update tool status
     tool.is_available = False
     tool.checkout_date = datetime.utcnow()
-    tool.location = data.get('location', 'unknown')
+    assign_location(tool, location, 'tool_count')
     if data.get('checked_out_by'):
         tool.checked_out_by = data.get('checked_out_by')
     
     db.session.add(checkout)
-    db.session.commit()
-    return jsonify({'success': True, 'tool': tool.to_dict()}), 200
+    commit_versioned('tool', Tool, tool_id)
+    invalidate_tool(tool_id)
+    overdue_scheduler.track(tool.id, tool.asset_type, tool.checkout_date)
+    return versioned_response('tool', tool)
 
 @tools_bp.route('/<int:tool_id>/checkin', methods=['POST'])
 def checkin_tool(tool_id):
@@ -159,28 +217,51 @@ def checkin_tool(tool_id):
         raise APIError("Tool not found", 404)
     
     data = request.get_json() or {}
+    location = resolve_location(data, default='warehouse')
     # Find the open checkout log and close it
     checkout = CheckoutLog.query.filter_by(tool_id=tool.id, checkin_time=None).first()
     if checkout:
         checkout.checkin_time = datetime.utcnow()
-        checkout.location_checkin = data.get('location', 'warehouse')
+        checkout.location_checkin = location.path
     
     # Update tool status
     tool.is_available = True
     tool.checkout_date = None
-    tool.location = data.get('location', 'warehouse')
+    assign_location(tool, location, 'tool_count')
     tool.checked_out_by = None
-    db.session.commit()
-    return jsonify({'success': True, 'tool': tool.to_dict()}), 200
+    commit_versioned('tool', Tool, tool_id)
+    invalidate_tool(tool_id)
+    overdue_scheduler.untrack(tool.id)
+    return versioned_response('tool', tool)
+
+@tools_bp.route('/overdue', methods=['GET'])
+def list_overdue():
+    """Tools checked out past their asset_type loan limit, served from the in-memory due-time heap."""
+    loans = overdue_scheduler.overdue()
+    tools = {t.id: t for t in Tool.query.filter(Tool.id.in_([loan['tool_id'] for loan in loans]),
+                                                Tool.checkout_date.isnot(None))} if loans else {}
+    # Another worker may have checked the tool in (or out again) since this heap last resynced
+    loans = [loan for loan in loans
+             if loan['tool_id'] in tools and tools[loan['tool_id']].checkout_date == loan['checkout_date']]
+    now = datetime.utcnow()
+    return jsonify({
+        'success': True,
+        'overdue': [{
+            'tool': tools[loan['tool_id']].to_dict(),
+            'due_at': loan['due_at'].isoformat(),
+            'overdue_hours': round((now - loan['due_at']).total_seconds() / 3600, 1),
+        } for loan in loans],
+    }), 200
 
 # ========== SERIAL NUMBER MANAGEMENT ==========
 
 @tools_bp.route('/<int:tool_id>/serial', methods=['POST'])
 def update_serial(tool_id):
-    """Update tool serial number. Serial numbers must be unique across all tools."""
+    """Update tool serial number. Serial numbers must be unique across all tools. Honors If-Match."""
     tool = Tool.query.get(tool_id)
     if not tool:
         raise APIError("Tool not found", 404)
+    check_if_match('tool', tool)
 
     data = request.get_json() or {}
     serial = data.get('serial_number')
@@ -192,12 +273,116 @@ def update_serial(tool_id):
         raise ValidationError("serial_number already exists")
 
     tool.serial_number = serial
-    db.session.commit()
-    return jsonify({'success': True, 'tool': tool.to_dict()}), 200
+    commit_versioned('tool', Tool, tool_id)
+    invalidate_tool(tool_id)
+    return versioned_response('tool', tool)
+
+# ========== PHYSICAL INVENTORY RECONCILIATION ==========
+
+@tools_bp.route('/reconcile', methods=['POST'])
+def reconcile_tools():
+    """
+    Compare a bulk serial scan against recorded inventory for one location and
+    everything under it (auditing a site covers its buildings and floors).
+    Body: {"location": "Site B - Floor 2", "serials": ["HD-2024-001", ...]}
+    ("location_id" may replace "location"; the path is matched like any location input,
+    so 'Site B -  Floor 2' finds 'Site B - Floor 2').
+    Returns serials found in place, missing from the scan, found but recorded
+    elsewhere (unexpected), and unknown to the system.
+    """
+    data = request.get_json() or {}
+    serials = data.get('serials')
+    if not (data.get('location') or data.get('location_id') is not None) or not isinstance(serials, list):
+        raise ValidationError("location (or location_id) and serials (list) required")
+    if len(serials) > current_app.config['RECONCILE_MAX_SERIALS']:
+        raise ValidationError(f"At most {current_app.config['RECONCILE_MAX_SERIALS']} serials per request")
+    
+    if data.get('location_id') is not None:
+        location = resolve_location(data)
+    else:
+        # Read-only lookup: a scan must not create locations; an unknown path simply expects nothing
+        location = find_path(data['location'])
+    location_id = location.id if location else None
+    in_scope = subtree_ids(location) if location else set()
+    
+    # De-duplicate while keeping scan order
+    scanned = list(dict.fromkeys(str(s).strip() for s in serials if s is not None and str(s).strip()))
+    
+    # Resolve scanned serials in chunks via the serial_number unique index, loading only needed columns
+    chunk_size = current_app.config['RECONCILE_CHUNK_SIZE']
+    recorded = {}
+    for start in range(0, len(scanned), chunk_size):
+        chunk = scanned[start:start + chunk_size]
+        rows = db.session.query(Tool.id, Tool.serial_number, Tool.location, Tool.location_id) \
+            .filter(Tool.serial_number.in_(chunk)).all()
+        recorded.update({row.serial_number: row for row in rows})
+    
+    # Tools the system expects at this location or below it (tools.location_id index)
+    expected = {row.serial_number: row.id for row in db.session.query(Tool.id, Tool.serial_number)
+                .filter(Tool.location_id.in_(in_scope), Tool.serial_number.isnot(None))} if in_scope else {}
+    
+    found, unexpected, unknown = [], [], []
+    for serial in scanned:
+        row = recorded.get(serial)
+        if row is None:
+            unknown.append(serial)
+        elif row.location_id in in_scope:
+            found.append({'id': row.id, 'serial_number': serial})
+        else:
+            unexpected.append({'id': row.id, 'serial_number': serial, 'recorded_location': row.location})
+    scanned_set = set(scanned)
+    missing = [{'id': tool_id, 'serial_number': serial}
+               for serial, tool_id in expected.items() if serial not in scanned_set]
+    
+    return jsonify({
+        'success': True,
+        'location': location.path if location else PATH_SEPARATOR.join(split_path(data.get('location', ''))),
+        'location_id': location_id,
+        'counts': {
+            'scanned': len(scanned),
+            'found': len(found),
+            'missing': len(missing),
+            'unexpected': len(unexpected),
+            'unknown': len(unknown),
+        },
+        'found': found,
+        'missing': missing,
+        'unexpected': unexpected,
+        'unknown': unknown,
+    }), 200
+
+# ========== TOOL PHOTOS ==========
+
+@tools_bp.route('/<int:tool_id>/photo', methods=['POST'])
+def upload_photo(tool_id):
+    """Attach a photo (multipart field 'photo'). Stored by content hash; thumbnail is built in the background."""
+    tool = Tool.query.get(tool_id)
+    if not tool:
+        raise APIError("Tool not found", 404)
+    check_if_match('tool', tool)
+    
+    if request.content_length and request.content_length > current_app.config['PHOTO_MAX_BYTES']:
+        raise APIError("Photo too large", 413)
+    photo = request.files.get('photo')
+    if not photo:
+        raise ValidationError("photo file required")
+    if not sniff_image_type(photo.stream.read(12)):
+        raise ValidationError("photo must be a JPEG, PNG or WebP image")
+    photo.stream.seek(0)
+    
+    try:
+        tool.photo_hash = photo_store.put(photo.stream, max_bytes=current_app.config['PHOTO_MAX_BYTES'])
+    except BlobTooLarge:
+        raise APIError("Photo too large", 413)
+    commit_versioned('tool', Tool, tool_id)
+    invalidate_tool(tool_id)
+    photo_store.schedule_thumbnail(tool.photo_hash)
+    return versioned_response('tool', tool)
 
 # ========== MATERIAL INVENTORY MANAGEMENT ==========
 
 @tools_bp.route('/materials', methods=['GET'])
+@response_cache.cached('materials')
 def list_materials():
     """Fetch all materials (consumables) tracked in inventory."""
     materials = Material.query.all()
@@ -216,17 +401,22 @@ def create_material():
         quantity=data.get('quantity', 0),
         min_stock=data.get('min_stock', 5)
     )
+    assign_location(material, resolve_location(data), 'material_count')
     db.session.add(material)
     db.session.commit()
-    return jsonify({'success': True, 'material': material.to_dict()}), 201
+    response_cache.invalidate('materials')
+    return versioned_response('material', material, 201)
 
 @tools_bp.route('/materials/<int:material_id>', methods=['PUT'])
 def update_material(material_id):
-    """Update material attributes: name, unit, quantity, and reorder threshold."""
+    """Update material attributes: name, unit, quantity, and reorder threshold. Honors If-Match."""
     material = Material.query.get(material_id)
     if not material:
         raise APIError("Material not found", 404)
+    check_if_match('material', material)
     data = request.get_json() or {}
+    moving = 'location' in data or 'location_id' in data
+    location = resolve_location(data) if moving else None
     
     if 'name' in data:
         material.name = data['name']
@@ -236,9 +426,12 @@ def update_material(material_id):
         material.quantity = int(data['quantity'])
     if 'min_stock' in data:
         material.min_stock = int(data['min_stock'])
+    if moving:
+        assign_location(material, location, 'material_count')
     
-    db.session.commit()
-    return jsonify({'success': True, 'material': material.to_dict()}), 200
+    commit_versioned('material', Material, material_id)
+    response_cache.invalidate('materials')
+    return versioned_response('material', material)
 
 @tools_bp.route('/materials/<int:material_id>', methods=['DELETE'])
 def delete_material(material_id):
@@ -246,6 +439,9 @@ def delete_material(material_id):
     material = Material.query.get(material_id)
     if not material:
         raise APIError("Material not found", 404)
+    check_if_match('material', material)
+    adjust_rollup(material.location_id, 'material_count', -1)
     db.session.delete(material)
-    db.session.commit()
+    commit_versioned('material', Material, material_id)
+    response_cache.invalidate('materials')
     return jsonify({'success': True}), 200
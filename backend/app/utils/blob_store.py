@@ -0,0 +1,132 @@
+"""
+Content-addressed blob storage for tool photos.
+Blobs are stored once under their SHA-256 (root/ab/cd/<hash>), so identical
+uploads deduplicate for free and files never change once written. Thumbnails
+are generated next to the original (<hash>.thumb.jpg) on a background thread pool.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; photos are served without thumbnails
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+HASH_RE = re.compile(r'^[0-9a-f]{64}$')
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of the image formats we accept
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+)
+
+class BlobTooLarge(Exception):
+    """Upload exceeded the size limit passed to BlobStore.put."""
+
+def sniff_image_type(head):
+    """Return the image mimetype for the first bytes of a file, or None if unsupported."""
+    for signature, mimetype in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return mimetype
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.error('Thumbnail generation failed: %s', future.exception())
+
+class BlobStore:
+    """On-disk content-addressed store with background thumbnail generation."""
+
+    def __init__(self, app=None):
+        self.root = None
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.root = os.path.abspath(app.config.get('PHOTO_STORAGE_PATH', 'instance/photos'))
+        self.thumbnail_size = app.config.get('PHOTO_THUMBNAIL_SIZE', 320)
+        self.workers = app.config.get('PHOTO_THUMBNAIL_WORKERS', 2)
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, blob_hash, thumbnail=False):
+        if not HASH_RE.match(blob_hash):
+            raise ValueError("Invalid blob hash")
+        name = f'{blob_hash}.thumb.jpg' if thumbnail else blob_hash
+        return os.path.join(self.root, blob_hash[:2], blob_hash[2:4], name)
+
+    def exists(self, blob_hash, thumbnail=False):
+        return os.path.exists(self.path(blob_hash, thumbnail))
+
+    def put(self, stream, max_bytes=None):
+        """
+        Stream a file into the store and return its hash. Existing content is not rewritten.
+        Raises BlobTooLarge, keeping nothing, once more than max_bytes have been read.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise BlobTooLarge(max_bytes)
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            blob_hash = digest.hexdigest()
+            final_path = self.path(blob_hash)
+            if os.path.exists(final_path):
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return blob_hash
+
+    def _pool(self):
+        # Threads do not survive fork, so each worker process builds its own pool.
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='thumbnail')
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def schedule_thumbnail(self, blob_hash):
+        """Queue thumbnail generation; no-op if it already exists or Pillow is missing."""
+        if Image is None or self.exists(blob_hash, thumbnail=True):
+            return None
+        future = self._pool().submit(self.make_thumbnail, blob_hash)
+        future.add_done_callback(_log_failure)
+        return future
+
+    def make_thumbnail(self, blob_hash):
+        target = self.path(blob_hash, thumbnail=True)
+        with Image.open(self.path(blob_hash)) as image:
+            thumb = ImageOps.exif_transpose(image).convert('RGB')
+        thumb.thumbnail((self.thumbnail_size, self.thumbnail_size))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix='.thumb-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                thumb.save(tmp, 'JPEG', quality=80, optimize=True)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return target
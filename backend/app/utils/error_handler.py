@@ -1,4 +1,5 @@
-from flask import jsonify
+from flask import jsonify, current_app
+from sqlalchemy.exc import OperationalError
 
 class APIError(Exception):
     def __init__(self, message, status_code=500):
@@ -9,6 +10,19 @@ class ValidationError(APIError):
     def __init__(self, message):
         super().__init__(message, 400)
 
+class RateLimitError(APIError):
+    """429 (rate limited) or 503 (load shed) carrying a Retry-After hint in seconds."""
+    def __init__(self, message, retry_after, status_code=429):
+        super().__init__(message, status_code)
+        self.retry_after = retry_after
+
+class ConflictError(APIError):
+    """409 for a stale write; carries the current state of the resource."""
+    def __init__(self, message, key, current):
+        super().__init__(message, 409)
+        self.key = key
+        self.current = current
+
 def error_response(error, status_code):
     return jsonify({'success': False, 'error': error}), status_code
 
@@ -17,6 +31,32 @@ def register_error_handlers(app):
     def handle_api_error(error):
         return error_response(error.message, error.status_code)
     
+    @app.errorhandler(RateLimitError)
+    def handle_rate_limit_error(error):
+        response, status_code = error_response(error.message, error.status_code)
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response, status_code
+    
+    @app.errorhandler(ConflictError)
+    def handle_conflict_error(error):
+        response = jsonify({'success': False, 'error': error.message, error.key: error.current})
+        response.headers['ETag'] = f'"{error.current["version"]}"'
+        return response, 409
+    
+    @app.errorhandler(OperationalError)
+    def handle_operational_error(error):
+        # SQLite lock timeout: transient, so tell the client to retry instead of a bare 500
+        if 'database is locked' in str(error.orig):
+            response, status_code = error_response('database locked', 503)
+            response.headers['Retry-After'] = '1'
+            return response, status_code
+        current_app.logger.exception('Database error')
+        return error_response('Internal server error', 500)
+    
+    @app.errorhandler(413)
+    def handle_413(error):
+        return error_response('Request too large', 413)
+    
     @app.errorhandler(404)
     def handle_404(error):
         return error_response('Not found', 404)
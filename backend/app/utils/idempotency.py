@@ -0,0 +1,82 @@
+"""
+Idempotency-Key support for mutating requests.
+The first request carrying a key runs normally and its response is stored;
+retries with the same key (same caller, method, path and body) get the stored
+response back without running the view or touching the database.
+A retry that arrives while the first attempt is still running gets 409.
+"""
+import hashlib
+from flask import request, g
+from app.utils.error_handler import APIError
+from app.utils.kvstore import create_store
+from app.utils.rate_limit import current_identity
+
+MUTATING_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+REPLAYED_HEADERS = ('Content-Type', 'ETag', 'Location')
+
+class IdempotencyGuard:
+    """Flask extension that records and replays responses keyed by Idempotency-Key."""
+
+    def __init__(self, app=None):
+        self.store = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('IDEMPOTENCY_TTL', 86400)
+        self.pending_ttl = app.config.get('IDEMPOTENCY_PENDING_TTL', 60)
+        self.store = create_store(app, app.config.get('IDEMPOTENCY_BACKEND', 'memory'), 'idempotency',
+                                  app.config.get('IDEMPOTENCY_MAX_KEYS', 10000), setting='IDEMPOTENCY_BACKEND')
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.teardown_request(self._teardown)
+
+    def _before(self):
+        key = request.headers.get('Idempotency-Key')
+        if request.method not in MUTATING_METHODS or not key:
+            return None
+        if len(key) > 255:
+            raise APIError("Idempotency-Key must be at most 255 characters", 400)
+
+        store_key = f'{current_identity()}:{request.method}:{request.path}:{key}'
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        pending = {'state': 'pending', 'fingerprint': fingerprint}
+
+        if not self.store.add(store_key, pending, ttl=self.pending_ttl):
+            record = self.store.get(store_key) or pending
+            if record['fingerprint'] != fingerprint:
+                raise APIError("Idempotency-Key was already used with a different request body", 422)
+            if record['state'] == 'pending':
+                raise APIError("A request with this Idempotency-Key is still in progress", 409)
+            return self._replay(record)
+
+        g.idempotency_key = store_key
+        g.idempotency_fingerprint = fingerprint
+        return None
+
+    def _replay(self, record):
+        headers = dict(record['headers'], **{'Idempotent-Replayed': 'true'})
+        return record['body'], record['status'], headers
+
+    def _after(self, response):
+        store_key = g.pop('idempotency_key', None)
+        if store_key is None:
+            return response
+        if response.status_code >= 500 or response.status_code == 429 or response.direct_passthrough:
+            # Throttling and server-side failures are not final; let the client retry for real.
+            self.store.delete(store_key)
+            return response
+        self.store.set(store_key, {
+            'state': 'done',
+            'fingerprint': g.idempotency_fingerprint,
+            'status': response.status_code,
+            'body': response.get_data(as_text=True),
+            'headers': {h: response.headers[h] for h in REPLAYED_HEADERS if h in response.headers},
+        }, ttl=self.ttl)
+        return response
+
+    def _teardown(self, exc=None):
+        # Unhandled exception: after_request never ran, so release the pending key.
+        store_key = g.pop('idempotency_key', None)
+        if store_key is not None:
+            self.store.delete(store_key)
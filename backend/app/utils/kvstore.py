@@ -0,0 +1,203 @@
+"""
+Small key-value stores with TTL expiry and a size bound.
+MemoryStore is per-process (default). SQLiteStore keeps entries in a local
+SQLite file so every gunicorn worker on the host sees the same state; it stands
+in for a shared cache such as Redis. Values must be JSON-serializable.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+class MemoryStore:
+    """Thread-safe LRU dictionary with per-entry TTL."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (value, expires_at or None)
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _put(self, key, value, ttl, now):
+        self._data[key] = (value, now + ttl if ttl else None)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key, time.time())
+            return entry[0] if entry else None
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._put(key, value, ttl, time.time())
+
+    def add(self, key, value, ttl=None):
+        """Store value only if key is absent. Returns True if it was stored."""
+        with self._lock:
+            now = time.time()
+            if self._live(key, now):
+                return False
+            self._put(key, value, ttl, now)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def update(self, key, fn, ttl=None):
+        """Atomically replace the value with fn(old_value_or_None) and return it."""
+        with self._lock:
+            now = time.time()
+            entry = self._live(key, now)
+            value = fn(entry[0] if entry else None)
+            self._put(key, value, ttl, now)
+            return value
+
+    def incr(self, key, ttl=None):
+        return self.update(key, lambda v: (v or 0) + 1, ttl)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class SQLiteStore:
+    """Cross-process store backed by a SQLite file (one connection per thread), LRU-bounded like MemoryStore."""
+
+    PRUNE_EVERY = 256  # writes between expiry/size sweeps
+    TOUCH_AFTER = 5    # seconds; hits refresh touched_at at most this often so reads rarely write
+
+    def __init__(self, path, namespace, max_entries=10000):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS kv ('
+            ' namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,'
+            ' expires_at REAL, touched_at REAL NOT NULL,'
+            ' PRIMARY KEY (namespace, key))'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_kv_expires ON kv (namespace, expires_at)')
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_kv_touched ON kv (namespace, touched_at)')
+
+    def _conn(self):
+        # Connections are per thread and re-opened after fork (pid check).
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _read(self, conn, key, now, touch=False):
+        row = conn.execute(
+            'SELECT value, expires_at, touched_at FROM kv WHERE namespace = ? AND key = ?',
+            (self.namespace, key),
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+        if touch and now - row[2] > self.TOUCH_AFTER:
+            # Eviction drops the least recently touched entries, so hits must count as use
+            try:
+                conn.execute('UPDATE kv SET touched_at = ? WHERE namespace = ? AND key = ?',
+                             (now, self.namespace, key))
+            except sqlite3.OperationalError:
+                pass  # writer busy: skip the recency bump rather than delay the hit
+        return json.loads(row[0])
+
+    def _write(self, conn, key, value, ttl, now):
+        conn.execute(
+            'INSERT OR REPLACE INTO kv (namespace, key, value, expires_at, touched_at) VALUES (?, ?, ?, ?, ?)',
+            (self.namespace, key, json.dumps(value), now + ttl if ttl else None, now),
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune(conn, now)
+
+    def _prune(self, conn, now):
+        conn.execute('DELETE FROM kv WHERE namespace = ? AND expires_at <= ?', (self.namespace, now))
+        conn.execute(
+            'DELETE FROM kv WHERE namespace = ? AND key IN ('
+            ' SELECT key FROM kv WHERE namespace = ? ORDER BY touched_at DESC LIMIT -1 OFFSET ?)',
+            (self.namespace, self.namespace, self.max_entries),
+        )
+
+    def get(self, key):
+        return self._read(self._conn(), key, time.time(), touch=True)
+
+    def set(self, key, value, ttl=None):
+        self._write(self._conn(), key, value, ttl, time.time())
+
+    def add(self, key, value, ttl=None):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            stored = self._read(conn, key, now) is None
+            if stored:
+                self._write(conn, key, value, ttl, now)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return stored
+
+    def delete(self, key):
+        self._conn().execute('DELETE FROM kv WHERE namespace = ? AND key = ?', (self.namespace, key))
+
+    def update(self, key, fn, ttl=None):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            value = fn(self._read(conn, key, now))
+            self._write(conn, key, value, ttl, now)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return value
+
+    def incr(self, key, ttl=None):
+        return self.update(key, lambda v: (v or 0) + 1, ttl)
+
+    def clear(self):
+        self._conn().execute('DELETE FROM kv WHERE namespace = ?', (self.namespace,))
+
+def worker_count():
+    """Number of server worker processes (gunicorn.conf.py exports WEB_CONCURRENCY)."""
+    return int(os.getenv('WEB_CONCURRENCY', 1))
+
+def create_store(app, backend, namespace, max_entries=10000, setting=None):
+    """
+    Build a store from config: backend is 'memory' or 'shared'.
+    Pass the config key as `setting` for state that is only correct when every worker
+    sees it; the 'memory' backend is then refused when more than one worker runs.
+    """
+    if backend == 'memory':
+        if setting and worker_count() > 1:
+            raise RuntimeError(f"{setting}='memory' is per process; set it to 'shared' "
+                               f"when running {worker_count()} workers")
+        return MemoryStore(max_entries)
+    if backend == 'shared':
+        return SQLiteStore(app.config['SHARED_STORE_PATH'], namespace, max_entries)
+    raise ValueError(f"Unknown store backend: {backend}")
@@ -0,0 +1,127 @@
+"""
+Location hierarchy helpers and inventory rollups.
+Free-text locations ('Site B - Floor 2') resolve to a site -> building -> floor
+chain of Location rows. Every Location keeps tool_count/material_count for its
+whole subtree; placing or moving an item adjusts its old and new ancestor chains
+with atomic UPDATE ... SET count = count +/- 1 statements in the same transaction.
+"""
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Location, Tool, Material
+from app.utils.error_handler import ValidationError
+
+PATH_SEPARATOR = ' - '
+FLOOR_WORDS = ('floor', 'level')
+
+def guess_kind(depth, name):
+    if depth == 0:
+        return 'site'
+    if name.lower().startswith(FLOOR_WORDS):
+        return 'floor'
+    return 'building'
+
+def create_child(parent, name, kind=None):
+    """Returns (location, created); an existing child with this name is returned untouched."""
+    parent_id = parent.id if parent else None
+    location = Location.query.filter_by(parent_id=parent_id, name=name).first()
+    if location:
+        return location, False
+    path = f'{parent.path}{PATH_SEPARATOR}{name}' if parent else name
+    depth = len(path.split(PATH_SEPARATOR)) - 1
+    try:
+        # Savepoint: a concurrent request may create the same location first
+        with db.session.begin_nested():
+            location = Location(name=name, kind=kind or guess_kind(depth, name), parent_id=parent_id, path=path)
+            db.session.add(location)
+    except IntegrityError:
+        location = Location.query.filter_by(parent_id=parent_id, name=name).first()
+        if location is None:
+            raise
+        return location, False
+    return location, True
+
+def get_or_create_child(parent, name):
+    return create_child(parent, name)[0]
+
+def split_path(text):
+    """'Site B -  Floor 2' -> ['Site B', 'Floor 2']"""
+    return [part.strip() for part in text.split(PATH_SEPARATOR) if part.strip()]
+
+def resolve_path(text):
+    """Return the Location for a 'Site - Building - Floor' path, creating missing levels."""
+    location = None
+    for name in split_path(text):
+        location = get_or_create_child(location, name)
+    return location
+
+def find_path(text):
+    """Return the existing Location for a path without creating anything, or None."""
+    location = None
+    for name in split_path(text):
+        location = Location.query.filter_by(parent_id=location.id if location else None, name=name).first()
+        if location is None:
+            return None
+    return location
+
+def resolve_location(data, default=None):
+    """Location from request data: 'location_id' wins over a free-text 'location'."""
+    if data.get('location_id') is not None:
+        location = db.session.get(Location, data['location_id'])
+        if not location:
+            raise ValidationError("location_id not found")
+        return location
+    text = data.get('location', default)
+    return resolve_path(text) if text else None
+
+def ancestor_ids(location_id):
+    ids = []
+    while location_id is not None:
+        ids.append(location_id)
+        location_id = db.session.get(Location, location_id).parent_id
+    return ids
+
+def subtree_ids(location):
+    """Ids of a location and every location under it (matched on the path prefix)."""
+    rows = db.session.query(Location.id).filter(db.or_(
+        Location.path == location.path,
+        Location.path.startswith(location.path + PATH_SEPARATOR, autoescape=True)))
+    return {row.id for row in rows}
+
+def adjust_rollup(location_id, counter, delta):
+    """Add delta to `counter` on a location and all of its ancestors."""
+    if location_id is None:
+        return
+    column = getattr(Location, counter)
+    # No autoflush: the caller's pending versioned row must reach commit_versioned (409), not fail here
+    with db.session.no_autoflush:
+        Location.query.filter(Location.id.in_(ancestor_ids(location_id))) \
+            .update({column: column + delta}, synchronize_session=False)
+
+def assign_location(obj, location, counter):
+    """Place a tool/material at `location` (or nowhere), moving its rollup contribution."""
+    new_id = location.id if location else None
+    if obj.location_id != new_id:
+        adjust_rollup(obj.location_id, counter, -1)
+        adjust_rollup(new_id, counter, 1)
+    obj.location_id = new_id
+    obj.location = location.path if location else None
+
+def rebuild_rollups():
+    """Link free-text locations to the hierarchy and recompute every rollup from scratch."""
+    for model in (Tool, Material):
+        texts = db.session.query(model.location).filter(model.location_id.is_(None), model.location.isnot(None)) \
+            .distinct().all()
+        for (text,) in texts:
+            location = resolve_path(text)
+            if location:
+                model.query.filter(model.location_id.is_(None), model.location == text) \
+                    .update({model.location_id: location.id, model.location: location.path},
+                            synchronize_session=False)
+    Location.query.update({Location.tool_count: 0, Location.material_count: 0}, synchronize_session=False)
+    for model, counter in ((Tool, 'tool_count'), (Material, 'material_count')):
+        rows = db.session.query(model.location_id, func.count(model.id)) \
+            .filter(model.location_id.isnot(None)).group_by(model.location_id).all()
+        for location_id, count in rows:
+            adjust_rollup(location_id, counter, count)
+    db.session.commit()
@@ -0,0 +1,150 @@
+"""
+Overdue checkout detection.
+Keeps a min-heap of loan due times for checked-out tools. The heap is rebuilt
+from the indexed tools.checkout_date column when a worker starts (and every
+OVERDUE_RESYNC_SECONDS to pick up checkouts made by other workers), then kept
+current by checkout/checkin. A background thread sleeps until the next due time
+and emits an overdue event; nothing ever scans the whole tools table.
+Every worker tracks every loan, so each event is claimed in a store keyed by
+tool and due time before listeners run; with OVERDUE_EVENT_BACKEND='shared'
+exactly one worker emits it.
+"""
+import heapq
+import os
+import threading
+from datetime import datetime, timedelta
+from app.utils.kvstore import create_store
+
+class OverdueScheduler:
+    """Per-process scheduler of tool loan due times."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._heap = []       # (due_at, tool_id) with stale entries skipped lazily
+        self._loans = {}      # tool_id -> {'asset_type', 'checkout_date', 'due_at'}
+        self._overdue = set()
+        self._listeners = []
+        self._cond = threading.Condition()
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.loan_limits = {k: timedelta(hours=v) for k, v in app.config.get('OVERDUE_LOAN_LIMITS', {}).items()}
+        self.default_limit = timedelta(hours=app.config.get('OVERDUE_DEFAULT_LOAN_HOURS', 168))
+        self.resync_interval = app.config.get('OVERDUE_RESYNC_SECONDS', 300)
+        self.event_ttl = app.config.get('OVERDUE_EVENT_TTL', 30 * 86400)
+        self.claims = create_store(app, app.config.get('OVERDUE_EVENT_BACKEND', 'memory'), 'overdue_events',
+                                   app.config.get('OVERDUE_EVENT_MAX_KEYS', 100000), setting='OVERDUE_EVENT_BACKEND')
+        self.on_overdue(lambda loan: app.logger.warning(
+            'Tool %s (%s) overdue since %s', loan['tool_id'], loan['asset_type'], loan['due_at'].isoformat()))
+        if app.config.get('OVERDUE_SCHEDULER_ENABLED', True):
+            app.before_request(self._ensure_started)
+
+    def on_overdue(self, callback):
+        """Register callback(loan_dict) fired once when a loan becomes overdue."""
+        self._listeners.append(callback)
+
+    def loan_limit(self, asset_type):
+        return self.loan_limits.get(asset_type, self.default_limit)
+
+    # ---- incremental updates from checkout/checkin ----
+
+    def track(self, tool_id, asset_type, checkout_date):
+        """Record (or replace) an open loan."""
+        due_at = checkout_date + self.loan_limit(asset_type)
+        with self._cond:
+            self._loans[tool_id] = {'asset_type': asset_type, 'checkout_date': checkout_date, 'due_at': due_at}
+            self._overdue.discard(tool_id)
+            heapq.heappush(self._heap, (due_at, tool_id))
+            self._cond.notify()
+
+    def untrack(self, tool_id):
+        """Forget a loan (checkin or delete). Its heap entry is dropped lazily."""
+        with self._cond:
+            self._loans.pop(tool_id, None)
+            self._overdue.discard(tool_id)
+
+    # ---- queries ----
+
+    def overdue(self):
+        """Currently overdue loans, most overdue first."""
+        fired = self._collect(datetime.utcnow())
+        self._emit(fired)
+        with self._cond:
+            loans = [dict(self._loans[tool_id], tool_id=tool_id) for tool_id in self._overdue]
+        return sorted(loans, key=lambda loan: loan['due_at'])
+
+    # ---- internals ----
+
+    def _collect(self, now):
+        """Pop due heap entries and mark their loans overdue. Returns newly overdue loans."""
+        fired = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                due_at, tool_id = heapq.heappop(self._heap)
+                loan = self._loans.get(tool_id)
+                if loan is None or loan['due_at'] != due_at or tool_id in self._overdue:
+                    continue  # stale entry from a checkin or re-checkout
+                self._overdue.add(tool_id)
+                fired.append(dict(loan, tool_id=tool_id))
+        return fired
+
+    def _emit(self, fired):
+        for loan in fired:
+            # First worker to claim the (tool, due time) pair reports it
+            if not self.claims.add(f"{loan['tool_id']}:{loan['due_at'].isoformat()}", os.getpid(), ttl=self.event_ttl):
+                continue
+            for callback in self._listeners:
+                try:
+                    callback(loan)
+                except Exception:
+                    self.app.logger.exception('Overdue listener failed')
+
+    def rebuild(self):
+        """Reload open loans from the database (indexed on checkout_date)."""
+        from app import db
+        from app.models import Tool
+        with self.app.app_context():
+            rows = db.session.query(Tool.id, Tool.asset_type, Tool.checkout_date) \
+                .filter(Tool.checkout_date.isnot(None)).all()
+            db.session.remove()
+        loans = {row.id: {'asset_type': row.asset_type, 'checkout_date': row.checkout_date,
+                          'due_at': row.checkout_date + self.loan_limit(row.asset_type)} for row in rows}
+        with self._cond:
+            # Already-reported loans stay reported; new ones are detected by the next _collect
+            self._overdue &= {tool_id for tool_id, loan in loans.items()
+                              if self._loans.get(tool_id, {}).get('due_at') == loan['due_at']}
+            self._loans = loans
+            self._heap = [(loan['due_at'], tool_id) for tool_id, loan in loans.items()]
+            heapq.heapify(self._heap)
+            self._cond.notify()
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so each worker process starts its own.
+        if self._pid == os.getpid():
+            return
+        with self._cond:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        self.rebuild()
+        threading.Thread(target=self._run, name='overdue-scheduler', daemon=True).start()
+
+    def _run(self):
+        next_resync = datetime.utcnow() + timedelta(seconds=self.resync_interval)
+        while True:
+            now = datetime.utcnow()
+            if now >= next_resync:
+                try:
+                    self.rebuild()
+                except Exception:
+                    self.app.logger.exception('Overdue scheduler resync failed')
+                next_resync = now + timedelta(seconds=self.resync_interval)
+            self._emit(self._collect(now))
+            with self._cond:
+                wake_at = next_resync
+                if self._heap and self._heap[0][0] < wake_at:
+                    wake_at = self._heap[0][0]
+                self._cond.wait(timeout=max(0.0, (wake_at - datetime.utcnow()).total_seconds()))
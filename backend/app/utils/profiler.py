@@ -0,0 +1,173 @@
+"""
+On-demand request profiling.
+When PROFILER_ENABLED is set, a request is profiled if it carries
+`X-Profile: <PROFILER_TOKEN>` (or `?_profile=<PROFILER_TOKEN>`), or if it is picked
+by 1-in-PROFILER_SAMPLE_RATE sampling. A profiled request records a cProfile
+profile plus every SQL statement it ran, and is written after the response is
+sent to a ring buffer of PROFILER_MAX_ARTIFACTS files under PROFILER_PATH.
+With the profiler disabled no hooks are installed at all.
+"""
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from flask import request, g
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MAX_SQL_STATEMENTS = 500
+TOP_FUNCTIONS = 40
+PROFILE_ID_CHARS = set('0123456789abcdef-')
+
+class RequestProfiler:
+    """Flask extension capturing per-request cProfile + SQL artifacts."""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.path = None
+        self._local = threading.local()
+        # cProfile allows one active profiler per process on recent Pythons
+        self._busy = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PROFILER_ENABLED', False)
+        self.path = os.path.abspath(app.config.get('PROFILER_PATH', 'instance/profiles'))
+        self.max_artifacts = app.config.get('PROFILER_MAX_ARTIFACTS', 50)
+        self.token = app.config.get('PROFILER_TOKEN')
+        self.sample_rate = app.config.get('PROFILER_SAMPLE_RATE', 0)
+        if not self.enabled:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+
+    # ---- trigger ----
+
+    def _trigger(self):
+        supplied = request.headers.get('X-Profile') or request.args.get('_profile')
+        if supplied and self.token and hmac.compare_digest(supplied, self.token):
+            return 'requested'
+        if self.sample_rate and random.randrange(self.sample_rate) == 0:
+            return 'sampled'
+        return None
+
+    # ---- request hooks ----
+
+    def _start(self):
+        trigger = self._trigger()
+        if not trigger or not self._busy.acquire(blocking=False):
+            return
+        self._local.sql = []
+        g.profile = {'trigger': trigger, 'started': time.perf_counter(), 'profiler': cProfile.Profile()}
+        g.profile['profiler'].enable()
+
+    def _stop(self):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return None
+        profile['profiler'].disable()
+        profile['duration_ms'] = round((time.perf_counter() - profile['started']) * 1000, 2)
+        profile['sql'] = self._local.sql or []
+        self._local.sql = None
+        self._busy.release()
+        return profile
+
+    def _finish(self, response):
+        profile = self._stop()
+        if profile is None:
+            return response
+        profile_id = f'{time.time_ns() // 1_000_000}-{uuid.uuid4().hex[:8]}'
+        meta = {
+            'id': profile_id,
+            'method': request.method,
+            'path': request.path,
+            'args': {k: v for k, v in request.args.items() if k != '_profile'},
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'trigger': profile['trigger'],
+            'duration_ms': profile['duration_ms'],
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        }
+        response.headers['X-Profile-Id'] = profile_id
+        # Serialize after the response has been sent
+        response.call_on_close(lambda: self._save(meta, profile['profiler'], profile['sql']))
+        return response
+
+    def _teardown(self, exc=None):
+        # Request died before after_request: drop the profile and free the profiler
+        self._stop()
+
+    # ---- SQL capture ----
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'sql', None) is not None:
+            context._profiler_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        sql = getattr(self._local, 'sql', None)
+        if sql is None or len(sql) >= MAX_SQL_STATEMENTS:
+            return
+        started = getattr(context, '_profiler_started', None)
+        sql.append({
+            'statement': statement,
+            'parameters': repr(parameters)[:500],
+            'duration_ms': round((time.perf_counter() - started) * 1000, 3) if started else None,
+        })
+
+    # ---- ring buffer ----
+
+    def _save(self, meta, profiler, sql):
+        stats_text = io.StringIO()
+        pstats.Stats(profiler, stream=stats_text).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        meta = dict(meta, sql_count=len(sql), sql_ms=round(sum(s['duration_ms'] or 0 for s in sql), 3))
+        profiler.dump_stats(os.path.join(self.path, f"{meta['id']}.prof"))
+        with open(os.path.join(self.path, f"{meta['id']}.json"), 'w') as f:
+            json.dump(dict(meta, sql=sql, top_functions=stats_text.getvalue()), f)
+        self._prune()
+
+    def _prune(self):
+        ids = sorted(name[:-5] for name in os.listdir(self.path) if name.endswith('.json'))
+        for profile_id in ids[:-self.max_artifacts]:
+            for ext in ('.json', '.prof'):
+                try:
+                    os.unlink(os.path.join(self.path, profile_id + ext))
+                except FileNotFoundError:
+                    pass
+
+    # ---- artifact access ----
+
+    def list_profiles(self):
+        """Metadata of stored profiles, newest first."""
+        if not self.path or not os.path.isdir(self.path):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(self.path), reverse=True):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.path, name)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue  # pruned or still being written
+            data.pop('sql', None)
+            data.pop('top_functions', None)
+            profiles.append(data)
+        return profiles
+
+    def artifact_path(self, profile_id, ext):
+        """Path of a stored artifact, or None if the id is malformed or missing."""
+        if not self.path or not profile_id or not set(profile_id) <= PROFILE_ID_CHARS:
+            return None
+        path = os.path.join(self.path, profile_id + ext)
+        return path if os.path.exists(path) else None
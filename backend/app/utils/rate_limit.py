@@ -0,0 +1,153 @@
+"""
+Token-bucket rate limiting and admission control.
+- limiter.limit('10/minute', per='ip') decorates a single route.
+- limiter.limit_blueprint(bp, '60/minute', per='user', methods=...) covers a blueprint.
+- Admission control sheds load with 503 when the server has queued more requests
+  than ADMISSION_MAX_QUEUED (gunicorn's per-worker thread-pool queue, reported
+  through set_backlog_probe), when a request waited too long in the proxy queue
+  (X-Request-Start), or when more than ADMISSION_MAX_IN_FLIGHT requests are inside
+  Flask at once. Under gunicorn gthread at most GUNICORN_THREADS requests are ever
+  inside Flask, so the queue checks do the shedding there; the in-flight cap
+  guards servers without a bounded pool (e.g. the development server).
+Bucket state lives in a pluggable store (see app.utils.kvstore).
+"""
+import math
+import threading
+import time
+from functools import wraps
+from flask import request, g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from app.utils.error_handler import RateLimitError
+from app.utils.kvstore import create_store
+
+_backlog_probe = None
+
+def set_backlog_probe(probe):
+    """Register a callable returning how many accepted requests are waiting for a server thread."""
+    global _backlog_probe
+    _backlog_probe = probe
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+def parse_rate(rate):
+    """Parse '10/minute' into (capacity, tokens refilled per second)."""
+    count, _, period = rate.partition('/')
+    seconds = PERIODS.get(period.strip().rstrip('s'))
+    if not seconds or not count.strip().isdigit():
+        raise ValueError(f"Invalid rate: {rate}")
+    capacity = int(count)
+    return capacity, capacity / seconds
+
+def take_token(state, capacity, refill_rate, now):
+    """Token-bucket step. Returns (new_state, retry_after); retry_after is 0 when allowed."""
+    tokens, updated = state if state else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill_rate)
+    if tokens >= 1:
+        return [tokens - 1, now], 0
+    return [tokens, now], (1 - tokens) / refill_rate
+
+def client_ip():
+    """
+    Client address. X-Forwarded-For is client-controlled, so it is never read here;
+    behind a proxy set PROXY_FIX_X_FOR and ProxyFix rewrites remote_addr from the
+    right-most trusted hop.
+    """
+    return request.remote_addr or 'unknown'
+
+def current_identity():
+    """'user:<id>' when a valid JWT is present, otherwise 'ip:<addr>'."""
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        user_id = None
+    return f'user:{user_id}' if user_id is not None else f'ip:{client_ip()}'
+
+class RateLimiter:
+    """Flask extension holding bucket state and the admission controller."""
+
+    def __init__(self, app=None):
+        self.store = None
+        self.enabled = False
+        self._overrides = {}
+        self._slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        self._overrides = app.config.get('RATELIMIT_OVERRIDES', {})
+        # Per-worker buckets would multiply every limit by the worker count
+        self.store = create_store(app, app.config.get('RATELIMIT_BACKEND', 'memory'), 'ratelimit',
+                                  app.config.get('RATELIMIT_MAX_KEYS', 100000),
+                                  setting='RATELIMIT_BACKEND' if self.enabled else None)
+        if app.config.get('ADMISSION_ENABLED', True):
+            self._max_wait = app.config.get('ADMISSION_MAX_QUEUE_WAIT', 0.5)
+            self._max_queued = app.config.get('ADMISSION_MAX_QUEUED', 8)
+            self._retry_after = app.config.get('ADMISSION_RETRY_AFTER', 1)
+            self._slots = threading.BoundedSemaphore(app.config.get('ADMISSION_MAX_IN_FLIGHT', 64))
+            app.before_request(self._admit)
+            app.teardown_request(self._release)
+
+    # ---- token buckets ----
+
+    def check(self, scope, rate, per):
+        """Consume one token for the caller in `scope`; raise 429 if the bucket is empty."""
+        if not self.enabled:
+            return
+        rate = self._overrides.get(scope, rate)
+        capacity, refill_rate = parse_rate(rate)
+        ident = current_identity() if per == 'user' else f'ip:{client_ip()}'
+        result = {}
+
+        def step(state):
+            new_state, result['retry_after'] = take_token(state, capacity, refill_rate, time.time())
+            return new_state
+
+        # Idle buckets expire once they would have refilled completely.
+        self.store.update(f'{scope}:{ident}', step, ttl=math.ceil(capacity / refill_rate))
+        if result['retry_after']:
+            raise RateLimitError("Rate limit exceeded", math.ceil(result['retry_after']))
+
+    def limit(self, rate, per='ip'):
+        """Route decorator: `per` is 'ip' or 'user' (falls back to IP when unauthenticated)."""
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                self.check(request.endpoint, rate, per)
+                return f(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def limit_blueprint(self, bp, rate, per='user', methods=None):
+        """Apply one shared bucket per caller to every matching request in a blueprint."""
+        @bp.before_request
+        def _limit_blueprint():
+            if methods is None or request.method in methods:
+                self.check(bp.name, rate, per)
+
+    # ---- admission control ----
+
+    def _queue_wait(self):
+        """Seconds spent queued upstream, from a proxy-set X-Request-Start ('t=<epoch ms>')."""
+        header = request.headers.get('X-Request-Start', '')
+        try:
+            started = float(header.removeprefix('t=')) / 1000
+        except ValueError:
+            return 0
+        return max(0, time.time() - started)
+
+    def _admit(self):
+        if request.path == '/healthz':
+            return
+        if _backlog_probe is not None and _backlog_probe() > self._max_queued:
+            raise RateLimitError("Server busy, retry later", self._retry_after, 503)
+        if self._queue_wait() > self._max_wait:
+            raise RateLimitError("Server busy, retry later", self._retry_after, 503)
+        if not self._slots.acquire(timeout=self._max_wait):
+            raise RateLimitError("Server busy, retry later", self._retry_after, 503)
+        g.admission_slot = True
+
+    def _release(self, exc=None):
+        if g.pop('admission_slot', False):
+            self._slots.release()
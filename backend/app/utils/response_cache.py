@@ -0,0 +1,90 @@
+"""
+Read-through cache for JSON GET responses.
+- @response_cache.cached('tools', 'tool:{tool_id}', args={'page': (int, 1)}) caches a view
+  keyed by endpoint, its URL kwargs and the listed query args (typed, with defaults).
+- response_cache.invalidate('tools', 'tool:7') after a write makes every entry carrying
+  one of those tags unreachable, by bumping the tag's generation counter.
+Entries live in a pluggable store (app.utils.kvstore) with LRU eviction and TTL. With
+several workers the 'shared' backend is required so invalidations reach every process;
+production defaults to it and 'memory' is refused when more than one worker runs.
+"""
+import threading
+from functools import wraps
+from flask import request, make_response
+from app.utils.kvstore import create_store
+
+CACHED_HEADERS = ('Content-Type', 'ETag')
+
+class ResponseCache:
+    """Flask extension holding cached responses, tag generations and hit/miss counters."""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.entries = None
+        self.generations = None
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 30)
+        backend = app.config.get('RESPONSE_CACHE_BACKEND', 'memory')
+        max_entries = app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 5000)
+        setting = 'RESPONSE_CACHE_BACKEND' if self.enabled else None
+        self.entries = create_store(app, backend, 'response_cache', max_entries, setting=setting)
+        # Generations outnumber entries so live tags are not evicted before the entries using them
+        self.generations = create_store(app, backend, 'response_cache_gen', max_entries * 10, setting=setting)
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 3) if lookups else None
+        return stats
+
+    def invalidate(self, *tags):
+        """Drop every cached response tagged with any of `tags`."""
+        if not self.enabled:
+            return
+        for tag in tags:
+            self.generations.incr(tag)
+        self._count('invalidations')
+
+    def cached(self, *tags, args=None):
+        """Cache successful responses of a GET view. Tags may use the view's kwargs, e.g. 'tool:{tool_id}'."""
+        args = args or {}
+
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*view_args, **view_kwargs):
+                if not self.enabled:
+                    return f(*view_args, **view_kwargs)
+                resolved = [tag.format(**view_kwargs) for tag in tags]
+                generations = ','.join(f'{tag}={self.generations.get(tag) or 0}' for tag in resolved)
+                params = ','.join(f'{name}={request.args.get(name, default, type=cast)}'
+                                  for name, (cast, default) in sorted(args.items()))
+                key = f'{request.endpoint}|{sorted(view_kwargs.items())}|{params}|{generations}'
+
+                entry = self.entries.get(key)
+                if entry is not None:
+                    self._count('hits')
+                    return entry['body'], entry['status'], dict(entry['headers'], **{'X-Cache': 'HIT'})
+
+                self._count('misses')
+                response = make_response(f(*view_args, **view_kwargs))
+                if response.status_code == 200:
+                    self.entries.set(key, {
+                        'body': response.get_data(as_text=True),
+                        'status': response.status_code,
+                        'headers': {h: response.headers[h] for h in CACHED_HEADERS if h in response.headers},
+                    }, ttl=self.ttl)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
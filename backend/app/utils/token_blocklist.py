@@ -0,0 +1,89 @@
+"""
+JWT revocation list.
+Revoked token ids (jti) are stored in the revoked_tokens table until the token
+would have expired anyway. Each worker keeps a Bloom filter of revoked jtis, so
+the per-request check is a few hash probes: only a filter hit (a revoked token
+or a rare false positive) queries the indexed table. Revocations made by other
+workers are pulled in incrementally every JWT_BLOCKLIST_REFRESH_SECONDS by
+id; revoked_tokens ids are AUTOINCREMENT so a purge never lets a later
+revocation reuse an id other workers have already read past.
+"""
+import threading
+import time
+from datetime import datetime
+from app.utils.bloom import BloomFilter
+
+class TokenBlocklist:
+    """Flask extension backing jwt.token_in_blocklist_loader."""
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_id = 0
+        self._next_refresh = 0
+        self._next_purge = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.capacity = app.config.get('JWT_BLOCKLIST_CAPACITY', 100000)
+        self.error_rate = app.config.get('JWT_BLOCKLIST_ERROR_RATE', 0.01)
+        self.refresh_interval = app.config.get('JWT_BLOCKLIST_REFRESH_SECONDS', 5)
+        self.purge_interval = app.config.get('JWT_BLOCKLIST_PURGE_SECONDS', 3600)
+
+    def revoke(self, jti, expires_at):
+        """Persist a revocation and add it to this worker's filter immediately."""
+        from app import db
+        from app.models import RevokedToken
+        if not RevokedToken.query.filter_by(jti=jti).first():
+            db.session.add(RevokedToken(jti=jti, expires_at=expires_at))
+            db.session.commit()
+        self._sync()
+        with self._lock:
+            self._bloom.add(jti)
+
+    def is_revoked(self, jti):
+        self._sync()
+        if jti not in self._bloom:
+            return False
+        from app.models import RevokedToken
+        return RevokedToken.query.filter_by(jti=jti).first() is not None
+
+    def _sync(self):
+        """Refresh the filter from the table when due (one indexed query per interval)."""
+        now = time.monotonic()
+        if self._bloom is not None and now < self._next_refresh:
+            return
+        with self._lock:
+            if self._bloom is not None and now < self._next_refresh:
+                return
+            if self._bloom is None or now >= self._next_purge:
+                self._rebuild()
+                self._next_purge = now + self.purge_interval
+            else:
+                self._load_new()
+            self._next_refresh = now + self.refresh_interval
+
+    def _load_new(self):
+        from app import db
+        from app.models import RevokedToken
+        rows = db.session.query(RevokedToken.id, RevokedToken.jti) \
+            .filter(RevokedToken.id > self._last_id).order_by(RevokedToken.id).all()
+        for row in rows:
+            self._bloom.add(row.jti)
+            self._last_id = row.id
+        if self._bloom.count > self._bloom.capacity:
+            self._rebuild()
+
+    def _rebuild(self):
+        """Drop expired revocations and rebuild the filter (Bloom filters cannot delete)."""
+        from app import db
+        from app.models import RevokedToken
+        RevokedToken.query.filter(RevokedToken.expires_at < datetime.utcnow()).delete()
+        db.session.commit()
+        rows = db.session.query(RevokedToken.id, RevokedToken.jti).order_by(RevokedToken.id).all()
+        bloom = BloomFilter(max(self.capacity, len(rows) * 2), self.error_rate)
+        for row in rows:
+            bloom.add(row.jti)
+        self._last_id = rows[-1].id if rows else self._last_id
+        self._bloom = bloom
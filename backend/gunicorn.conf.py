@@ -0,0 +1,55 @@
+"""
+Gunicorn configuration for the TradeFlow API.
+Pre-fork model: the master imports the app once (preload_app) and forks
+worker processes, each serving requests on a small thread pool.
+All values can be overridden through environment variables.
+"""
+import multiprocessing
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '3000')}"
+
+# Worker processes: one per core plus one by default (SQLite serializes writes,
+# so more processes mostly help read-heavy traffic).
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() + 1))
+# Exported so the preloaded app can refuse per-process stores with several workers
+os.environ['WEB_CONCURRENCY'] = str(workers)
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+backlog = int(os.getenv('GUNICORN_BACKLOG', 2048))
+
+# Load create_app() in the master so workers fork with the app already imported.
+preload_app = True
+
+# Recycle workers periodically to bound memory growth.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 500))
+
+# Graceful shutdown: on SIGTERM workers stop accepting and finish in-flight requests.
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+
+def post_worker_init(worker):
+    """Let admission control see requests queued for this worker's thread pool."""
+    from app.utils.rate_limit import set_backlog_probe
+    if getattr(worker, 'tpool', None) is not None:
+        set_backlog_probe(lambda: worker.tpool._work_queue.qsize())
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the preloaded master."""
+    _dispose_engine()
+
+def worker_exit(server, worker):
+    """Close pooled database connections when a worker shuts down."""
+    _dispose_engine()
+
+def _dispose_engine():
+    from wsgi import app
+    from app import db
+    with app.app_context():
+        db.engine.dispose()
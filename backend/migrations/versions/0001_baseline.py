@@ -0,0 +1,102 @@
+"""Baseline schema: users, tools, materials, checkout and audit logs
+
+Databases created by `python run.py` before migrations existed already have these
+tables and no alembic_version row, so each table is only created if missing and
+`flask db upgrade` works on them without a manual stamp.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('username', sa.String(length=80), nullable=False, unique=True),
+            sa.Column('email', sa.String(length=120), nullable=False, unique=True),
+            sa.Column('password_hash', sa.String(length=255), nullable=False),
+            sa.Column('company', sa.String(length=255), nullable=True),
+            sa.Column('role', sa.String(length=50), nullable=True),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+
+    if 'tools' not in existing:
+        op.create_table(
+            'tools',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('asset_type', sa.String(length=100), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('serial_number', sa.String(length=100), nullable=True, unique=True),
+            sa.Column('location', sa.String(length=255), nullable=True),
+            sa.Column('status', sa.String(length=50), nullable=True),
+            sa.Column('checkout_date', sa.DateTime(), nullable=True),
+            sa.Column('is_available', sa.Boolean(), nullable=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+            sa.Column('checked_out_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+
+    if 'materials' not in existing:
+        op.create_table(
+            'materials',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('unit', sa.String(length=50), nullable=True),
+            sa.Column('quantity', sa.Integer(), nullable=True),
+            sa.Column('min_stock', sa.Integer(), nullable=True),
+            sa.Column('location', sa.String(length=255), nullable=True),
+            sa.Column('cost_per_unit', sa.Float(), nullable=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+
+    if 'checkout_logs' not in existing:
+        op.create_table(
+            'checkout_logs',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('tool_id', sa.Integer(), sa.ForeignKey('tools.id'), nullable=False),
+            sa.Column('checkout_time', sa.DateTime(), nullable=True),
+            sa.Column('checkin_time', sa.DateTime(), nullable=True),
+            sa.Column('location_checkout', sa.String(length=255), nullable=True),
+            sa.Column('location_checkin', sa.String(length=255), nullable=True),
+            sa.Column('notes', sa.Text(), nullable=True),
+        )
+
+    if 'audit_logs' not in existing:
+        op.create_table(
+            'audit_logs',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('tool_id', sa.Integer(), sa.ForeignKey('tools.id'), nullable=False),
+            sa.Column('action', sa.String(length=100), nullable=False),
+            sa.Column('details', sa.Text(), nullable=True),
+            sa.Column('location', sa.String(length=255), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade():
+    op.drop_table('audit_logs')
+    op.drop_table('checkout_logs')
+    op.drop_table('materials')
+    op.drop_table('tools')
+    op.drop_table('users')
@@ -0,0 +1,113 @@
+"""Row versions, photos, location hierarchy and token revocation
+
+- tools/materials.version (optimistic locking), existing rows start at 1
+- tools.photo_hash
+- locations table; tools/materials.location_id
+- indexes on tools.location and tools.checkout_date
+- revoked_tokens table
+
+Databases built with `db.create_all()` from newer models (run.py, init-db before
+migrations existed) may already have some of these, so every step checks first.
+
+Revision ID: 0002_inventory_schema
+Revises: 0001_baseline
+Create Date: 2026-10-19 09:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_inventory_schema'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+ROOT_ONLY = sa.text('parent_id IS NULL')
+
+
+def _columns(inspector, table):
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def _indexes(inspector, table):
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if 'locations' not in tables:
+        op.create_table(
+            'locations',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('kind', sa.String(length=20), nullable=False),
+            sa.Column('parent_id', sa.Integer(), sa.ForeignKey('locations.id'), nullable=True),
+            sa.Column('path', sa.String(length=255), nullable=False),
+            sa.Column('tool_count', sa.Integer(), nullable=False),
+            sa.Column('material_count', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.UniqueConstraint('parent_id', 'name', name='uq_locations_parent_name'),
+        )
+        op.create_index('ix_locations_parent_id', 'locations', ['parent_id'])
+    if 'uq_locations_site_name' not in _indexes(sa.inspect(op.get_bind()), 'locations'):
+        op.create_index('uq_locations_site_name', 'locations', ['name'], unique=True,
+                        sqlite_where=ROOT_ONLY, postgresql_where=ROOT_ONLY)
+
+    columns = _columns(inspector, 'tools')
+    indexes = _indexes(inspector, 'tools')
+    with op.batch_alter_table('tools') as batch_op:
+        if 'location_id' not in columns:
+            batch_op.add_column(sa.Column('location_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_tools_location_id', 'locations', ['location_id'], ['id'])
+        if 'photo_hash' not in columns:
+            batch_op.add_column(sa.Column('photo_hash', sa.String(length=64), nullable=True))
+        if 'version' not in columns:
+            batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+        for name, column in (('ix_tools_location', 'location'), ('ix_tools_location_id', 'location_id'),
+                             ('ix_tools_checkout_date', 'checkout_date')):
+            if name not in indexes:
+                batch_op.create_index(name, [column])
+
+    columns = _columns(inspector, 'materials')
+    indexes = _indexes(inspector, 'materials')
+    with op.batch_alter_table('materials') as batch_op:
+        if 'location_id' not in columns:
+            batch_op.add_column(sa.Column('location_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_materials_location_id', 'locations', ['location_id'], ['id'])
+        if 'version' not in columns:
+            batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+        if 'ix_materials_location_id' not in indexes:
+            batch_op.create_index('ix_materials_location_id', ['location_id'])
+
+    if 'revoked_tokens' not in tables:
+        op.create_table(
+            'revoked_tokens',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('jti', sa.String(length=36), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.Column('revoked_at', sa.DateTime(), nullable=True),
+        )
+        op.create_index('ix_revoked_tokens_jti', 'revoked_tokens', ['jti'], unique=True)
+        op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'])
+
+
+def downgrade():
+    op.drop_table('revoked_tokens')
+    with op.batch_alter_table('materials') as batch_op:
+        batch_op.drop_index('ix_materials_location_id')
+        batch_op.drop_constraint('fk_materials_location_id', type_='foreignkey')
+        batch_op.drop_column('version')
+        batch_op.drop_column('location_id')
+    with op.batch_alter_table('tools') as batch_op:
+        batch_op.drop_index('ix_tools_checkout_date')
+        batch_op.drop_index('ix_tools_location_id')
+        batch_op.drop_index('ix_tools_location')
+        batch_op.drop_constraint('fk_tools_location_id', type_='foreignkey')
+        batch_op.drop_column('version')
+        batch_op.drop_column('photo_hash')
+        batch_op.drop_column('location_id')
+    op.drop_table('locations')
@@ -0,0 +1,40 @@
+"""Never reuse revoked_tokens ids
+
+TokenBlocklist pulls new revocations with `id > last seen id`. A plain SQLite
+INTEGER PRIMARY KEY hands out max(id) + 1, so after a purge deletes the newest
+row the next revocation reuses an id other workers have already passed and they
+never load it. Rebuild the table with AUTOINCREMENT (other databases use
+sequences, which never go backwards).
+
+Revision ID: 0003_revoked_tokens_autoincrement
+Revises: 0002_inventory_schema
+Create Date: 2026-10-19 09:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_revoked_tokens_autoincrement'
+down_revision = '0002_inventory_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    ddl = bind.execute(sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'revoked_tokens'")).scalar()
+    if 'AUTOINCREMENT' in (ddl or '').upper():
+        return  # created by a create_all() that already had sqlite_autoincrement
+    # Copying the rows seeds sqlite_sequence with the current max(id)
+    with op.batch_alter_table('revoked_tokens', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}):
+        pass
+
+
+def downgrade():
+    # AUTOINCREMENT is compatible with the previous schema; nothing to undo
+    pass
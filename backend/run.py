@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+"""Development server. For production use: gunicorn -c gunicorn.conf.py wsgi:app"""
 import os
 from app import create_app, db
 
@@ -4,6 +4,7 @@ Run this script to populate the database with test users.
 """
 from app import create_app, db
 from app.models import User, Tool, Material
+from app.utils.locations import rebuild_rollups
 from werkzeug.security import generate_password_hash
 from datetime import datetime, timedelta
 
@@ -244,6 +245,9 @@ def seed_demo_users():
         
         db.session.commit()
         
+        # Build the site/building/floor hierarchy and inventory rollups from the demo locations
+        rebuild_rollups()
+        
         print("\n✅ Demo users, tools, and materials created successfully!")
         print("\nLogin credentials:")
         print("  Technician      -> username: demo        | password: demo123")
@@ -0,0 +1,9 @@
+"""
+Production WSGI entry point.
+Serve with: gunicorn -c gunicorn.conf.py wsgi:app
+Run `flask --app wsgi db upgrade` before starting the server.
+"""
+import os
+from app import create_app
+
+app = create_app(os.getenv('FLASK_ENV', 'production'))
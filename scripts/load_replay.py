@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Shift-start traffic replay.
+
+Generates a dataset in a scratch SQLite database, starts the production server
+(gunicorn, see backend/gunicorn.conf.py) and replays the 7 a.m. pattern with
+concurrent virtual users, phase by phase:
+
+  1. login_storm     every user logs in at once
+  2. checkout_burst  users check tools out and back in
+  3. polling         users poll list_tools / list_materials / get_tool
+
+Each phase reports per-route throughput, p50/p95/p99 latency, error rate and
+lock-timeout rate (SQLite "database is locked", served as 503 'database locked'),
+plus 409/429 counts and 503s shed by admission control.
+
+Usage:
+    python scripts/load_replay.py                         # defaults below
+    python scripts/load_replay.py --users 400 --workers 4 --threads 8
+    python scripts/load_replay.py --mix mix.json --json-out results.json
+
+A mix file replaces the default phases:
+    {"phases": [{"name": "polling", "duration": 60, "think_time": 0.5,
+                 "routes": {"list_tools": 6, "list_materials": 3, "get_tool": 1}}]}
+A phase with "duration": null runs each route once per user (e.g. the login storm).
+Routes: login, me, list_tools, get_tool, list_materials, checkout_tool, checkin_tool,
+update_material, overdue.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from load_test import BACKEND_DIR, start_server, wait_ready
+
+PASSWORD = 'load123'
+
+DEFAULT_PHASES = [
+    {'name': 'login_storm', 'duration': None, 'think_time': 0, 'routes': {'login': 1}},
+    {'name': 'checkout_burst', 'duration': 20, 'think_time': 0.2,
+     'routes': {'checkout_tool': 1, 'checkin_tool': 1}},
+    {'name': 'polling', 'duration': 30, 'think_time': 1.0,
+     'routes': {'list_tools': 6, 'list_materials': 3, 'get_tool': 1}},
+]
+
+# ---------- dataset ----------
+
+def seed_dataset(env, users, tools, materials):
+    """Create schema and bulk-insert users, tools and materials in one subprocess."""
+    seed = f'''
+from werkzeug.security import generate_password_hash
+from wsgi import app
+from app import db
+from app.models import User, Tool, Material
+with app.app_context():
+    db.create_all()
+    password_hash = generate_password_hash({PASSWORD!r})  # hashed once, shared by all users
+    db.session.execute(User.__table__.insert(), [
+        dict(username=f"loaduser{{i}}", email=f"loaduser{{i}}@example.com", password_hash=password_hash,
+             role="foreman", is_active=True) for i in range({users})])
+    db.session.execute(Tool.__table__.insert(), [
+        dict(name=f"Load Tool {{i}}", asset_type=("power_tool", "hand_tool", "testing_equipment")[i % 3],
+             serial_number=f"LR-{{i:07d}}", location=f"Site {{chr(65 + i % 5)}} - Floor {{i % 4 + 1}}",
+             status="available", is_available=True, version=1) for i in range({tools})])
+    db.session.execute(Material.__table__.insert(), [
+        dict(name=f"Load Material {{i}}", unit="box", quantity=100, min_stock=10, version=1)
+        for i in range({materials})])
+    db.session.commit()
+'''
+    subprocess.run([sys.executable, '-c', seed], cwd=BACKEND_DIR, env=env, check=True)
+
+# ---------- virtual users ----------
+
+class VirtualUser:
+    """One simulated device: its own keep-alive connection, token and checked-out tools."""
+
+    def __init__(self, index, host, port, dataset):
+        self.index = index
+        self.host, self.port = host, port
+        self.dataset = dataset
+        self.token = None
+        self.checked_out = []
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+
+    def request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            resp = self.conn.getresponse()
+            return resp.status, resp.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            return None, b''
+
+    def random_tool(self):
+        return random.randint(1, self.dataset['tools'])
+
+    # Each route returns (status, body) and may update user state
+    def login(self):
+        status, body = self.request('POST', '/api/auth/login',
+                                    {'username': f'loaduser{self.index}', 'password': PASSWORD})
+        if status == 200:
+            self.token = json.loads(body)['access_token']
+        return status, body
+
+    def me(self):
+        return self.request('GET', '/api/auth/me')
+
+    def list_tools(self):
+        pages = max(1, self.dataset['tools'] // 10)
+        return self.request('GET', f'/api/tools?page={random.randint(1, min(pages, 20))}&per_page=10')
+
+    def get_tool(self):
+        return self.request('GET', f'/api/tools/{self.random_tool()}')
+
+    def list_materials(self):
+        return self.request('GET', '/api/tools/materials')
+
+    def checkout_tool(self):
+        tool_id = self.random_tool()
+        status, body = self.request('POST', f'/api/tools/{tool_id}/checkout', {'location': 'Site A - Floor 1'})
+        if status == 200:
+            self.checked_out.append(tool_id)
+        return status, body
+
+    def checkin_tool(self):
+        tool_id = self.checked_out.pop() if self.checked_out else self.random_tool()
+        return self.request('POST', f'/api/tools/{tool_id}/checkin', {'location': 'Warehouse'})
+
+    def update_material(self):
+        material_id = random.randint(1, self.dataset['materials'])
+        return self.request('PUT', f'/api/tools/materials/{material_id}', {'quantity': random.randint(0, 200)})
+
+    def overdue(self):
+        return self.request('GET', '/api/tools/overdue')
+
+ROUTES = ('login', 'me', 'list_tools', 'get_tool', 'list_materials', 'checkout_tool',
+          'checkin_tool', 'update_material', 'overdue')
+
+# ---------- measurement ----------
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.lock_timeouts = 0
+
+    def record(self, latency, status, body):
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status == 503 and b'database locked' in body:
+            self.lock_timeouts += 1
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(stats, elapsed):
+    rows = {}
+    for route, s in sorted(stats.items()):
+        count = len(s.latencies)
+        latencies = sorted(s.latencies)
+        errors = sum(n for status, n in s.statuses.items() if status is None or status >= 500)
+        rows[route] = {
+            'requests': count,
+            'rps': round(count / elapsed, 1) if elapsed else 0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+            'error_rate': round(errors / count, 4) if count else 0,
+            'lock_timeout_rate': round(s.lock_timeouts / count, 4) if count else 0,
+            'conflicts_409': s.statuses.get(409, 0),
+            'throttled_429': s.statuses.get(429, 0),
+            'shed_503': s.statuses.get(503, 0) - s.lock_timeouts,
+        }
+    return rows
+
+def print_report(name, elapsed, rows):
+    total = sum(r['requests'] for r in rows.values())
+    print(f'\n== {name}: {total} requests in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} req/s)')
+    print(f"{'route':<16} {'reqs':>7} {'req/s':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} "
+          f"{'err%':>6} {'lock%':>6} {'409':>5} {'429':>5} {'503':>5}")
+    for route, r in rows.items():
+        print(f"{route:<16} {r['requests']:>7} {r['rps']:>8,.1f} {r['p50_ms']:>8} {r['p95_ms']:>8} "
+              f"{r['p99_ms']:>8} {r['error_rate'] * 100:>6.2f} {r['lock_timeout_rate'] * 100:>6.2f} "
+              f"{r['conflicts_409']:>5} {r['throttled_429']:>5} {r['shed_503']:>5}")
+
+def run_phase(phase, vusers):
+    """Drive every virtual user through one phase concurrently and return (elapsed, rows)."""
+    routes = list(phase['routes'])
+    weights = [phase['routes'][r] for r in routes]
+    for route in routes:
+        if route not in ROUTES:
+            raise SystemExit(f'Unknown route in mix: {route}')
+    stats = {route: RouteStats() for route in routes}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(len(vusers) + 1)
+    duration = phase.get('duration')
+    think_time = phase.get('think_time', 0)
+
+    def call(vu, route):
+        t0 = time.perf_counter()
+        status, body = getattr(vu, route)()
+        latency = time.perf_counter() - t0
+        with lock:
+            stats[route].record(latency, status, body)
+
+    def drive(vu):
+        start_barrier.wait()
+        if duration is None:
+            for route in routes:
+                call(vu, route)
+            return
+        deadline = time.monotonic() + duration
+        # Stagger start a little so bursts are bursts, not a single synchronized wave
+        time.sleep(random.uniform(0, min(think_time, 1.0)))
+        while time.monotonic() < deadline:
+            call(vu, random.choices(routes, weights)[0])
+            if think_time:
+                time.sleep(random.expovariate(1 / think_time))
+
+    threads = [threading.Thread(target=drive, args=(vu,)) for vu in vusers]
+    for t in threads:
+        t.start()
+    start_barrier.wait()
+    started = time.monotonic()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+    return elapsed, summarize(stats, elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200, help='concurrent virtual users')
+    parser.add_argument('--tools', type=int, default=5000, help='tools in the generated dataset')
+    parser.add_argument('--materials', type=int, default=200, help='materials in the generated dataset')
+    parser.add_argument('--workers', type=int, default=None, help='gunicorn workers (default from gunicorn.conf.py)')
+    parser.add_argument('--threads', type=int, default=None, help='threads per gunicorn worker')
+    parser.add_argument('--port', type=int, default=3902)
+    parser.add_argument('--mix', default=None, help='JSON file with a "phases" list replacing the defaults')
+    parser.add_argument('--keep-rate-limits', action='store_true',
+                        help='leave per-IP/per-user rate limits on (all virtual users share one IP)')
+    parser.add_argument('--json-out', default=None, help='write per-phase results as JSON')
+    parser.add_argument('--seed', type=int, default=None, help='random seed for a repeatable replay')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    phases = DEFAULT_PHASES
+    if args.mix:
+        with open(args.mix) as f:
+            phases = json.load(f)['phases']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, FLASK_ENV='production',
+                   DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'replay.db')}",
+                   SHARED_STORE_PATH=os.path.join(tmp, 'shared_store.db'),
+                   PHOTO_STORAGE_PATH=os.path.join(tmp, 'photos'))
+        if not args.keep_rate_limits:
+            env['RATELIMIT_ENABLED'] = 'false'
+        if args.threads:
+            env['GUNICORN_THREADS'] = str(args.threads)
+
+        print(f'Seeding {args.users} users, {args.tools} tools, {args.materials} materials...')
+        seed_dataset(env, args.users, args.tools, args.materials)
+        dataset = {'tools': args.tools, 'materials': args.materials}
+
+        workers = args.workers or int(env.get('WEB_CONCURRENCY', (os.cpu_count() or 1) + 1))
+        proc = start_server(workers, args.port, env)
+        results = {}
+        try:
+            wait_ready(f'http://127.0.0.1:{args.port}')
+            print(f'Server up: {workers} workers x {env.get("GUNICORN_THREADS", 4)} threads, {args.users} virtual users')
+            vusers = [VirtualUser(i, '127.0.0.1', args.port, dataset) for i in range(args.users)]
+            for phase in phases:
+                elapsed, rows = run_phase(phase, vusers)
+                print_report(phase['name'], elapsed, rows)
+                results[phase['name']] = {'elapsed_s': round(elapsed, 2), 'routes': rows}
+        finally:
+            proc.terminate()
+            proc.wait(timeout=60)
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump({'users': args.users, 'workers': workers, 'phases': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
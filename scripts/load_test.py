@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Worker scaling load test for the production server.
+
+Starts gunicorn (backend/gunicorn.conf.py) with 1..N worker processes against a
+throwaway SQLite database, hammers a read endpoint with concurrent keep-alive
+clients, and prints requests/second for each worker count.
+
+Usage:
+    python scripts/load_test.py                      # 1..cpu_count workers
+    python scripts/load_test.py --workers 1 2 4 8 --duration 15 --clients 64
+    python scripts/load_test.py --url http://host:3000/api/tools   # existing server, no scaling sweep
+"""
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+def worker_loop(url, deadline, results, lock):
+    """Issue sequential requests on one keep-alive connection until the deadline."""
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+    ok = errors = 0
+    while time.monotonic() < deadline:
+        try:
+            conn.request('GET', path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status == 200:
+                ok += 1
+            else:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+    conn.close()
+    with lock:
+        results['ok'] += ok
+        results['errors'] += errors
+
+def run_load(url, clients, duration):
+    """Run `clients` concurrent connections for `duration` seconds; return (rps, errors)."""
+    results = {'ok': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    threads = [threading.Thread(target=worker_loop, args=(url, deadline, results, lock)) for _ in range(clients)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+    return results['ok'] / elapsed, results['errors']
+
+def wait_ready(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f'{base_url}/readyz', timeout=2) as resp:
+                if resp.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('server did not become ready')
+
+def start_server(workers, port, env):
+    env = dict(env, WEB_CONCURRENCY=str(workers), PORT=str(port), GUNICORN_ACCESSLOG='/dev/null')
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+def prepare_database(db_url, tools):
+    """Create the schema and seed `tools` rows so the list endpoint has real work to do."""
+    env = dict(os.environ, DATABASE_URL=db_url, FLASK_ENV='production')
+    seed = (
+        'from wsgi import app\n'
+        'from app import db\n'
+        'from app.models import Tool\n'
+        'with app.app_context():\n'
+        '    db.create_all()\n'
+        f'    db.session.add_all([Tool(name=f"Tool {{i}}", asset_type="power_tool", serial_number=f"LT-{{i:06d}}") for i in range({tools})])\n'
+        '    db.session.commit()\n'
+    )
+    subprocess.run([sys.executable, '-c', seed], cwd=BACKEND_DIR, env=env, check=True)
+    return env
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=None, help='worker counts to test')
+    parser.add_argument('--clients', type=int, default=32, help='concurrent client connections')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per measurement')
+    parser.add_argument('--path', default='/api/tools?page=1&per_page=10', help='endpoint to load')
+    parser.add_argument('--port', type=int, default=3901)
+    parser.add_argument('--tools', type=int, default=500, help='tools to seed in the scratch database')
+    parser.add_argument('--url', default=None, help='load an already running server instead')
+    args = parser.parse_args()
+
+    if args.url:
+        rps, errors = run_load(args.url, args.clients, args.duration)
+        print(f'{args.url}: {rps:,.0f} req/s ({errors} errors)')
+        return
+
+    worker_counts = args.workers or list(range(1, (os.cpu_count() or 1) + 1))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = prepare_database(f"sqlite:///{os.path.join(tmp, 'load.db')}", args.tools)
+        base_url = f'http://127.0.0.1:{args.port}'
+        baseline = None
+        print(f"{'workers':>8} {'req/s':>10} {'speedup':>8} {'errors':>7}")
+        for workers in worker_counts:
+            proc = start_server(workers, args.port, env)
+            try:
+                wait_ready(base_url)
+                rps, errors = run_load(base_url + args.path, args.clients, args.duration)
+            finally:
+                proc.terminate()
+                proc.wait(timeout=60)
+            baseline = baseline or rps
+            print(f'{workers:>8} {rps:>10,.0f} {rps / baseline:>7.2f}x {errors:>7}')
+
+if __name__ == '__main__':
+    main()